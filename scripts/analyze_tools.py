@@ -24,7 +24,7 @@ Usage:
     # Show tools using multiple placeholders (ANY)
     python scripts/analyze_tools.py --placeholders "Drug SMILES" "Protein sequence" --any
 
-    # JSON output
+    # JSON output (add --pretty for indented JSON)
     python scripts/analyze_tools.py --json
 
     # Show specific template details
@@ -32,26 +32,44 @@ Usage:
 """
 
 import argparse
+import heapq
 import json
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from txgemma.prompts import get_loader
-from txgemma.tool_factory import (
-    analyze_tools,
-    build_tools,
-    suggest_tool_subsets,
-)
+
+_BAR = "=" * 70
+
+
+@lru_cache(maxsize=1)
+def all_tools() -> tuple:
+    """
+    Build every tool exactly once, ordered by (parameter count, name).
+
+    Filtered views are derived from this tuple instead of rebuilding tools per branch,
+    and comprehensions over it preserve the display order, so no re-sorting is needed.
+    """
+    # Imported lazily so --source / --list-placeholders never pull in the tool factory
+    from txgemma.tool_factory import build_tools
+
+    return tuple(sorted(build_tools(), key=lambda t: (len(t.inputSchema["required"]), t.name)))
+
+
+def dump_json(data, pretty: bool = False) -> str:
+    """Serialize data as compact JSON, or indented when pretty is set."""
+    if pretty:
+        return json.dumps(data, indent=2)
+    return json.dumps(data, separators=(",", ":"))
 
 
 def print_section(title: str):
     """Print a section header."""
-    print(f"\n{'=' * 70}")
-    print(f"  {title}")
-    print(f"{'=' * 70}\n")
+    sys.stdout.write(f"\n{_BAR}\n  {title}\n{_BAR}\n\n")
 
 
 def print_template_details(template_name: str):
@@ -86,17 +104,17 @@ def print_template_details(template_name: str):
         print(f"  ... ({len(lines) - 10} more lines)")
 
     print("\nUsed by:")
-    # Show which tool factory would create from this
-    tools = build_tools()
-    matching = [t for t in tools if t.name == template_name]
-    if matching:
-        tool = matching[0]
-        print(f"  Tool name: {tool.name}")
-        print(f"  Description: {tool.description}")
-        print(f"  Parameters: {', '.join(tool.inputSchema['required'])}")
+    # Show the tool the factory would create from this, building only this one
+    from txgemma.tool_factory import build_tool_from_template
 
+    tool = build_tool_from_template(template, loader.placeholder_stats())
+    print(f"  Tool name: {tool.name}")
+    print(f"  Description: {tool.description}")
+    print(f"  Parameters: {', '.join(tool.inputSchema['required'])}")
 
-def main():
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
     parser = argparse.ArgumentParser(
         description="Analyze TxGemma MCP tools and prompts",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -125,6 +143,9 @@ Examples:
   
   # Export to JSON
   %(prog)s --json > tools.json
+
+  # Human-readable JSON
+  %(prog)s --json --pretty
         """,
     )
 
@@ -166,10 +187,16 @@ Examples:
 
     parser.add_argument("--json", action="store_true", help="Output as JSON")
 
+    parser.add_argument(
+        "--pretty", action="store_true", help="Indent JSON output (default: compact)"
+    )
+
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
 
-    args = parser.parse_args()
+    return parser.parse_args()
+
 
+def main(args: argparse.Namespace):
     # Set up logging if verbose
     if args.verbose:
         import logging
@@ -197,93 +224,108 @@ Examples:
         stats = loader.placeholder_stats()
 
         if args.json:
-            print(json.dumps(stats, indent=2))
+            print(dump_json(stats, args.pretty))
         else:
             total_placeholders = len(stats)
-            print(
+            lines = [
                 f"Found {total_placeholders} unique placeholder{'s' if total_placeholders != 1 else ''}\n"
-            )
+            ]
 
             # Sort by usage count (descending)
             for placeholder, count in sorted(stats.items(), key=lambda x: x[1], reverse=True):
-                tools_using = loader.placeholder_usage(placeholder)
-                example_tools = sorted(tools_using)[:3]
-
-                print(f"  📌 {placeholder:<40} ({count} tool{'s' if count != 1 else ''})")
+                lines.append(f"  📌 {placeholder:<40} ({count} tool{'s' if count != 1 else ''})")
                 if args.verbose:
-                    print(f"     Used in: {', '.join(example_tools)}")
+                    tools_using = loader.placeholder_usage(placeholder)
+                    example_tools = heapq.nsmallest(3, tools_using)
+                    lines.append(f"     Used in: {', '.join(example_tools)}")
                     if len(tools_using) > 3:
-                        print(f"              ... and {len(tools_using) - 3} more")
-                print()
+                        lines.append(f"              ... and {len(tools_using) - 3} more")
+                lines.append("")
+
+            # Emit the whole section in one write
+            sys.stdout.write("\n".join(lines) + "\n")
 
         return
 
-    # Build tools with filters
+    # Filter the cached tool list (required == template placeholders)
     if args.placeholder:
-        tools = build_tools(filter_placeholder=args.placeholder, exact_match=not args.fuzzy)
+        if args.fuzzy:
+            # Loader matches against placeholders lowercased once at load time
+            names = loader.filter_by_placeholder(args.placeholder, exact=False).keys()
+            tools = [t for t in all_tools() if t.name in names]
+        else:
+            tools = [t for t in all_tools() if args.placeholder in t.inputSchema["required"]]
         match_type = "fuzzy" if args.fuzzy else "exact"
         filter_desc = f"using '{args.placeholder}' ({match_type} match)"
 
     elif args.placeholders:
-        tools = build_tools(
-            filter_placeholders=args.placeholders,
-            match_all=not args.any,
-        )
+        match = any if args.any else all
+        tools = [
+            t
+            for t in all_tools()
+            if match(ph in t.inputSchema["required"] for ph in args.placeholders)
+        ]
         match_type = "ANY" if args.any else "ALL"
         filter_desc = f"using {match_type} of: {', '.join(args.placeholders)}"
 
     elif args.simple:
-        tools = build_tools(max_placeholders=2)
+        tools = [t for t in all_tools() if len(t.inputSchema["required"]) <= 2]
         filter_desc = "simple (≤2 placeholders)"
 
     elif args.complex:
-        tools = build_tools()
-        tools = [t for t in tools if len(t.inputSchema["required"]) >= 3]
+        tools = [t for t in all_tools() if len(t.inputSchema["required"]) >= 3]
         filter_desc = "complex (≥3 placeholders)"
 
     else:
-        tools = build_tools()
+        tools = list(all_tools())
         filter_desc = "all"
 
     # Output results
     if args.json:
-        output = []
-        for tool in tools:
-            output.append(
-                {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": tool.inputSchema["required"],
-                    "parameter_count": len(tool.inputSchema["required"]),
-                    "properties": tool.inputSchema.get("properties", {}),
-                }
-            )
-        print(json.dumps(output, indent=2))
+        output = [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool.inputSchema["required"],
+                "parameter_count": len(tool.inputSchema["required"]),
+                "properties": tool.inputSchema.get("properties", {}),
+            }
+            for tool in tools
+        ]
+        print(dump_json(output, args.pretty))
 
     else:
         print_section(f"Tools ({filter_desc})")
-        print(f"Found {len(tools)} tool{'s' if len(tools) != 1 else ''}\n")
+        lines = [f"Found {len(tools)} tool{'s' if len(tools) != 1 else ''}\n"]
 
-        for tool in sorted(tools, key=lambda t: (len(t.inputSchema["required"]), t.name)):
-            params = tool.inputSchema["required"]
+        for tool in tools:
+            # Bind the schema pieces once per tool instead of per parameter
+            schema = tool.inputSchema
+            params = schema["required"]
+            properties = schema.get("properties", {})
             param_count = len(params)
 
-            print(f"  📦 {tool.name}")
-            print(f"     {tool.description}")
-            print(f"     Parameters ({param_count}): {', '.join(params)}")
+            lines.append(f"  📦 {tool.name}")
+            lines.append(f"     {tool.description}")
+            lines.append(f"     Parameters ({param_count}): {', '.join(params)}")
 
             if args.verbose and param_count > 0:
-                print("     Details:")
+                lines.append("     Details:")
                 for param in params:
-                    prop = tool.inputSchema.get("properties", {}).get(param, {})
+                    prop = properties.get(param, {})
                     param_type = prop.get("type", "unknown")
                     param_desc = prop.get("description", "No description")
-                    print(f"       - {param} ({param_type}): {param_desc}")
+                    lines.append(f"       - {param} ({param_type}): {param_desc}")
 
-            print()
+            lines.append("")
+
+        # Emit the whole tool listing in one write
+        sys.stdout.write("\n".join(lines) + "\n")
 
         # Show statistics
         print_section("Tool Statistics")
+        from txgemma.tool_factory import analyze_tools
+
         stats = analyze_tools()
 
         print(f"  Total tools:              {stats['total_tools']}")
@@ -304,6 +346,8 @@ Examples:
 
         # Show suggested subsets
         print_section("Suggested Tool Subsets")
+        from txgemma.tool_factory import suggest_tool_subsets
+
         subsets = suggest_tool_subsets()
 
         for use_case, tool_names in sorted(subsets.items()):
@@ -313,7 +357,7 @@ Examples:
                 for tool_name in sorted(tool_names):
                     print(f"      - {tool_name}")
             elif tool_names:
-                examples = sorted(tool_names)[:3]
+                examples = heapq.nsmallest(3, tool_names)
                 print(f"    Examples: {', '.join(examples)}")
                 if len(tool_names) > 3:
                     print(f"              ... and {len(tool_names) - 3} more")
@@ -321,14 +365,15 @@ Examples:
 
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        main()
+        main(args)
     except KeyboardInterrupt:
         print("\n\nInterrupted by user")
         sys.exit(1)
     except Exception as e:
         print(f"\nError: {e}", file=sys.stderr)
-        if "--verbose" in sys.argv or "-v" in sys.argv:
+        if args.verbose:
             import traceback
 
             traceback.print_exc()
@@ -6,14 +6,23 @@ Entry point for the Model Context Protocol server exposing TxGemma tools.
 Uses FastMCP for dual stdio/SSE support.
 """
 
+import asyncio
+import json
 import logging
+from collections import defaultdict
+from functools import cache, lru_cache
 
 from fastmcp import FastMCP
 
 from txgemma.chat_factory import register_chat_tool
 from txgemma.config import get_config
-from txgemma.executor import execute_tool
-from txgemma.tool_factory import build_tools
+from txgemma.executor import execute_tool_async
+from txgemma.tool_factory import (
+    analyze_tools,
+    build_tool_description,
+    build_tools,
+    tool_manifest_digest,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -80,69 +89,151 @@ logger.info(f"Loaded {len(TOOLS)} tools")
 
 logger.info(f"Loaded {len(TOOLS)} tools")
 
-# Convert Tool objects to FastMCP format and register
+
+class ToolDispatcher:
+    """
+    Executes one named TxGemma tool.
+
+    A single shared implementation replaces a fresh closure per tool; only the
+    tool name is stored per instance.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def run(self, params: dict) -> str:
+        """
+        Execute a TxGemma tool with the provided parameters.
+
+        Runs asynchronously so concurrent calls can share a batched forward pass.
+
+        Args:
+            params: Dictionary of parameter name -> value mappings.
+                    Parameter names may contain spaces (e.g., "Drug SMILES").
+
+        Returns:
+            Prediction result from the TxGemma model.
+        """
+        try:
+            return await execute_tool_async(self.name, params)
+        except Exception as e:
+            # Let logging format lazily; only the returned message is built eagerly
+            logger.error("Tool execution failed for %s: %s", self.name, e)
+            return f"ERROR: {e}"
+
+
+# Metadata-only index used by the catalog tools below
+TOOL_INDEX = {tool.name: tool for tool in TOOLS}
+
+# Inverted index placeholder -> tools, built once for the txgemma://tools/{placeholder} resource
+_TOOLS_BY_PLACEHOLDER = defaultdict(list)
 for tool in TOOLS:
-    tool_name = tool.name
-    tool_description = tool.description
-    tool_schema = tool.inputSchema
-
-    # Enhance description with parameter information for agents
-    # This helps agents understand what parameters to provide
-    enhanced_description = tool_description
-    if tool_schema.get("properties"):
-        enhanced_description += "\n\nParameters:"
-        for param_name, param_info in tool_schema["properties"].items():
-            param_desc = param_info.get("description", "")
-            param_type = param_info.get("type", "string")
-            is_required = param_name in tool_schema.get("required", [])
-            required_marker = " (required)" if is_required else " (optional)"
-            enhanced_description += (
-                f"\n- {param_name}{required_marker}: {param_desc} (type: {param_type})"
-            )
+    for placeholder in tool.inputSchema["required"]:
+        _TOOLS_BY_PLACEHOLDER[placeholder].append(tool)
+_TOOLS_BY_PLACEHOLDER = dict(_TOOLS_BY_PLACEHOLDER)
+
+
+@lru_cache(maxsize=1)
+def _tool_listing() -> str:
+    """Render the tool catalog once; the index doesn't change after startup."""
+    return "\n".join(f"{name}: {tool.description}" for name, tool in TOOL_INDEX.items())
+
+
+def txgemma_list_tools() -> str:
+    """List available TxGemma prediction tools, one 'name: description' per line."""
+    return _tool_listing()
+
+
+@cache
+def _tool_description(tool_name: str) -> str:
+    """Build a tool's enhanced description on first request."""
+    return build_tool_description(TOOL_INDEX[tool_name])
+
+
+def txgemma_describe_tool(tool_name: str) -> str:
+    """Describe a TxGemma prediction tool and the parameters it expects."""
+    if tool_name not in TOOL_INDEX:
+        return f"ERROR: Unknown tool: {tool_name}"
+    return _tool_description(tool_name)
+
+
+async def txgemma_invoke(tool_name: str, arguments: dict) -> str:
+    """
+    Run a TxGemma prediction tool by name.
+
+    Args:
+        tool_name: Tool name as returned by txgemma_list_tools
+        arguments: Parameter name -> value mappings (see txgemma_describe_tool)
 
-    # Create a closure that captures the tool name
-    def make_tool_func(name: str):
-        def _tool_func(params: dict) -> str:
-            """
-            Execute a TxGemma tool with the provided parameters.
+    Returns:
+        Prediction result from the TxGemma model.
+    """
+    if tool_name not in TOOL_INDEX:
+        return f"ERROR: Unknown tool: {tool_name}"
+    return await ToolDispatcher(tool_name).run(arguments)
 
-            Args:
-                params: Dictionary of parameter name -> value mappings.
-                        Parameter names may contain spaces (e.g., "Drug SMILES").
 
-            Returns:
-                Prediction result from the TxGemma model.
-            """
-            try:
-                result = execute_tool(name, params)
-                return result
-            except Exception as e:
-                logger.error(f"Tool execution failed for {name}: {e}")
-                return f"ERROR: {str(e)}"
+async def txgemma_batch(calls: list[dict]) -> list[str]:
+    """
+    Run several TxGemma prediction tools in one request.
 
-        _tool_func.__name__ = name
+    Calls run concurrently, so the predict model serves them in batched forward passes.
 
-        return _tool_func
+    Args:
+        calls: List of {"tool_name": str, "arguments": dict} objects
 
-    # Register the tool
-    tool_func = make_tool_func(tool_name)
-    mcp.tool(name=tool_name, description=enhanced_description)(tool_func)
+    Returns:
+        One result per call, in order; failed calls yield an "ERROR: ..." string.
+    """
+    return list(
+        await asyncio.gather(
+            *(
+                txgemma_invoke(call.get("tool_name", ""), call.get("arguments", {}))
+                for call in calls
+            )
+        )
+    )
+
+
+mcp.tool(name="txgemma_batch")(txgemma_batch)
+
+if config.tools.lazy_registration:
+    # Advertise three catalog tools; per-tool descriptions are built on first request
+    mcp.tool(name="txgemma_list_tools")(txgemma_list_tools)
+    mcp.tool(name="txgemma_describe_tool")(txgemma_describe_tool)
+    mcp.tool(name="txgemma_invoke")(txgemma_invoke)
+
+    logger.info(f"Indexed {len(TOOL_INDEX)} tools behind txgemma_invoke")
+else:
+    # Enhance descriptions with parameter information for agents up front.
+    # This helps agents understand what parameters to provide; it is cheap pure-Python
+    # work, so it runs serially (a thread pool only adds overhead under the GIL).
+    TOOL_DESCRIPTIONS = [(tool.name, build_tool_description(tool)) for tool in TOOLS]
 
-logger.info(f"Registered {len(TOOLS)} tools with FastMCP")
+    # Register serially: the FastMCP registry is not documented as thread-safe
+    for tool_name, enhanced_description in TOOL_DESCRIPTIONS:
+        # Register a bound method of the shared dispatcher (FastMCP requires a routine)
+        mcp.tool(name=tool_name, description=enhanced_description)(ToolDispatcher(tool_name).run)
+
+    logger.info(f"Registered {len(TOOLS)} tools with FastMCP")
 
 # -----------------------------------------------------------------------------
 # Resources
 # -----------------------------------------------------------------------------
 
 
-@mcp.resource("txgemma://info")
-def server_info() -> str:
-    """Information about the TxGemma MCP server and available models."""
-    from txgemma.tool_factory import analyze_tools
-
+@lru_cache(maxsize=1)
+def _server_info_text() -> str:
+    """Render the server info once; tools and stats don't change after startup."""
     stats = analyze_tools()
+    placeholders_preview = "".join(
+        f"- {placeholder}: {count} tools\n"
+        for placeholder, count in stats["most_common_placeholders"][:5]
+    )
 
-    info = f"""
+    return f"""
 TxGemma MCP Server
 ==================
 
@@ -151,6 +242,7 @@ development and drug discovery tasks.
 
 Server Configuration:
 - Tools loaded: {len(TOOLS)}
+- Tool manifest digest: {tool_manifest_digest(TOOLS)}
 - Total available tools: {stats["total_tools"]}
 - Unique placeholders: {stats["total_placeholders"]}
 
@@ -163,30 +255,48 @@ Model Types:
 - Predict: Optimized for property predictions (current)
 - Chat: Conversational, can explain predictions
 
-Current Tools: {", ".join([t.name for t in TOOLS[:5]])}{"..." if len(TOOLS) > 5 else ""}
+Current Tools: {", ".join(t.name for t in TOOLS[:5])}{"..." if len(TOOLS) > 5 else ""}
 
 Most Common Placeholders:
-"""
-
-    for placeholder, count in stats["most_common_placeholders"][:5]:
-        info += f"- {placeholder}: {count} tools\n"
-
-    info += """
+{placeholders_preview}
 For more information, visit:
 https://developers.google.com/health-ai-developer-foundations/txgemma
 """
-    return info
+
+
+@mcp.resource("txgemma://info")
+def server_info() -> str:
+    """Information about the TxGemma MCP server and available models."""
+    return _server_info_text()
+
+
+@lru_cache(maxsize=1)
+def _stats_json() -> str:
+    """Serialize tool statistics once; they don't change after startup."""
+    return json.dumps(analyze_tools(), indent=2)
 
 
 @mcp.resource("txgemma://stats")
 def server_stats() -> str:
     """Detailed statistics about available tools."""
-    import json
-
-    from txgemma.tool_factory import analyze_tools
-
-    stats = analyze_tools()
-    return json.dumps(stats, indent=2)
+    return _stats_json()
+
+
+@mcp.resource("txgemma://tools/{placeholder}")
+def tools_by_placeholder(placeholder: str) -> str:
+    """
+    Tools that take a given placeholder (e.g. txgemma://tools/Drug%20SMILES).
+
+    A projected view of the catalog: clients fetch only the schemas they need
+    instead of the full tool list. Unknown placeholders yield an empty list.
+    """
+    return json.dumps(
+        [
+            {"name": t.name, "description": t.description, "inputSchema": t.inputSchema}
+            for t in _TOOLS_BY_PLACEHOLDER.get(placeholder, ())
+        ],
+        separators=(",", ":"),
+    )
 
 
 # -----------------------------------------------------------------------------
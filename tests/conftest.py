@@ -29,8 +29,37 @@ def pytest_collection_modifyitems(config, items):
     run_gpu = config.getoption("--run-gpu")
 
     skip_gpu = pytest.mark.skip(reason="need --run-gpu option to run")
+    # Under pytest-xdist (-n auto --dist loadgroup) keep GPU tests on one worker,
+    # so the session-scoped models below load once instead of once per worker
+    group_gpu = run_gpu and config.pluginmanager.hasplugin("xdist")
 
     for item in items:
+        if "gpu" not in item.keywords:
+            continue
         # Skip GPU tests unless --run-gpu is provided
-        if "gpu" in item.keywords and not run_gpu:
+        if not run_gpu:
             item.add_marker(skip_gpu)
+        elif group_gpu:
+            item.add_marker(pytest.mark.xdist_group("gpu"))
+
+
+@pytest.fixture(scope="session")
+def loaded_predict_model():
+    """Predict model loaded once and shared by all GPU tests in the session."""
+    from txgemma.model import get_predict_model
+
+    model = get_predict_model()
+    model.load()
+    yield model
+    model.unload()
+
+
+@pytest.fixture(scope="session")
+def loaded_chat_model():
+    """Chat model loaded once and shared by all GPU tests in the session."""
+    from txgemma.model import get_chat_model
+
+    model = get_chat_model()
+    model.load()
+    yield model
+    model.unload()
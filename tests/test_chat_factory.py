@@ -230,16 +230,6 @@ class TestRegisterChatTool:
 class TestChatToolIntegration:
     """Integration tests for chat tool (requires GPU)."""
 
-    @pytest.fixture(scope="class")
-    def loaded_chat_model(self):
-        """Load chat model once for all tests."""
-        from txgemma.model import get_chat_model
-
-        model = get_chat_model()
-        model.load()
-        yield model
-        model.unload()
-
     def test_execute_chat_real_model(self, loaded_chat_model):
         """Test execute_chat with real model."""
         result = execute_chat("What is a SMILES string?")
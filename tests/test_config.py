@@ -5,6 +5,7 @@ Tests configuration loading, validation, and environment variable overrides.
 """
 
 import os
+import time
 from pathlib import Path
 from unittest.mock import mock_open, patch
 
@@ -17,6 +18,7 @@ from txgemma.config import (
     PredictConfig,
     PromptsConfig,
     ToolsConfig,
+    _env_overlay,
     get_config,
     load_config,
 )
@@ -45,6 +47,7 @@ class TestConfigModels:
 
         assert config.filename == "tdc_prompts.json"
         assert config.local_override is None
+        assert config.prefer_cache is False
 
     def test_tools_config_defaults(self):
         """Test ToolsConfig default values."""
@@ -53,6 +56,7 @@ class TestConfigModels:
         assert config.filter_placeholder == "Drug SMILES"
         assert config.max_placeholders is None
         assert config.enable_chat is True
+        assert config.lazy_registration is False
         assert isinstance(config.prompts, PromptsConfig)
 
     def test_main_config_defaults(self):
@@ -90,6 +94,14 @@ class TestLoadConfigFromFile:
         assert config.chat.model == "google/txgemma-9b-chat"
         assert config.tools.filter_placeholder == "Drug SMILES"
 
+    def test_load_config_defaults_match_validated(self):
+        """Test that the unvalidated defaults path builds the same config as Config()."""
+        with patch.dict(os.environ, {}, clear=True):
+            config = load_config(Path("nonexistent.yaml"))
+
+        assert config == Config()
+        assert isinstance(config.tools.prompts, PromptsConfig)
+
     @patch(
         "builtins.open",
         new_callable=mock_open,
@@ -202,6 +214,16 @@ class TestEnvironmentVariableOverrides:
 
         assert config.chat.max_new_tokens == 500
 
+    @patch("pathlib.Path.exists")
+    def test_env_override_predict_max_tokens(self, mock_exists):
+        """Test TXGEMMA_PREDICT_MAX_TOKENS environment variable."""
+        mock_exists.return_value = False
+
+        with patch.dict(os.environ, {"TXGEMMA_PREDICT_MAX_TOKENS": "128"}):
+            config = load_config()
+
+        assert config.predict.max_new_tokens == 128
+
     @patch("pathlib.Path.exists")
     def test_env_override_filter_placeholder(self, mock_exists):
         """Test TXGEMMA_FILTER_PLACEHOLDER environment variable."""
@@ -256,6 +278,23 @@ chat:
         # YAML value used where no env override
         assert config.chat.model == "google/txgemma-9b-chat"
 
+    @patch(
+        "builtins.open",
+        new_callable=mock_open,
+        read_data="predict:\nchat:\n  max_new_tokens: 200\n",
+    )
+    @patch("pathlib.Path.exists")
+    def test_env_override_into_empty_yaml_section(self, mock_exists, mock_file):
+        """Test that an override fills a section left empty in YAML."""
+        mock_exists.return_value = True
+
+        with patch.dict(os.environ, {"TXGEMMA_PREDICT_MODEL": "google/txgemma-9b-predict"}):
+            config = load_config(Path("config.yaml"))
+
+        assert config.predict.model == "google/txgemma-9b-predict"
+        assert config.predict.max_new_tokens == 64
+        assert config.chat.max_new_tokens == 200
+
     @patch("pathlib.Path.exists")
     def test_multiple_env_overrides(self, mock_exists):
         """Test multiple environment variable overrides at once."""
@@ -277,6 +316,21 @@ chat:
         assert config.chat.max_new_tokens == 300
         assert config.tools.filter_placeholder is None
 
+    @patch("pathlib.Path.exists")
+    def test_env_overlay_parsed_once_per_environment(self, mock_exists):
+        """Test that an unchanged environment reuses the parsed overrides."""
+        mock_exists.return_value = False
+        _env_overlay.cache_clear()
+
+        with patch.dict(os.environ, {"TXGEMMA_CHAT_MAX_TOKENS": "300"}):
+            load_config()
+            config = load_config()
+
+        assert config.chat.max_new_tokens == 300
+        info = _env_overlay.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
 
 class TestGetConfigSingleton:
     """Test get_config singleton behavior."""
@@ -284,8 +338,7 @@ class TestGetConfigSingleton:
     def test_get_config_returns_config(self):
         """Test that get_config returns a Config instance."""
         # Clear singleton
-        if hasattr(get_config, "_config"):
-            delattr(get_config, "_config")
+        get_config.cache_clear()
 
         config = get_config()
 
@@ -294,14 +347,33 @@ class TestGetConfigSingleton:
     def test_get_config_singleton(self):
         """Test that get_config returns same instance."""
         # Clear singleton
-        if hasattr(get_config, "_config"):
-            delattr(get_config, "_config")
+        get_config.cache_clear()
 
         config1 = get_config()
         config2 = get_config()
 
         assert config1 is config2
 
+    @patch("txgemma.config.load_config")
+    def test_get_config_loads_once_across_threads(self, mock_load_config):
+        """Test that concurrent first calls load the configuration only once."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def slow_load():
+            time.sleep(0.05)
+            return Config()
+
+        mock_load_config.side_effect = slow_load
+        get_config.cache_clear()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            configs = list(pool.map(lambda _: get_config(), range(8)))
+
+        get_config.cache_clear()
+
+        mock_load_config.assert_called_once()
+        assert all(config is configs[0] for config in configs)
+
 
 class TestConfigValidation:
     """Test configuration validation."""
@@ -316,6 +388,28 @@ class TestConfigValidation:
         with pytest.raises(ValidationError):
             ToolsConfig(enable_chat="invalid")
 
+    @patch(
+        "builtins.open",
+        new_callable=mock_open,
+        read_data="""
+predict:
+  quantization: int4
+""",
+    )
+    @patch("pathlib.Path.exists")
+    def test_invalid_quantization_rejected_at_load(self, mock_exists, mock_file):
+        """Test that an unknown quantization mode fails config loading, not model loading."""
+        mock_exists.return_value = True
+
+        with pytest.raises(ValidationError, match="quantization"):
+            load_config(Path("config.yaml"))
+
+    @pytest.mark.parametrize("mode", ["int8", "nf4", None])
+    def test_valid_quantization_modes(self, mode):
+        """Test that the supported quantization modes validate."""
+        assert PredictConfig(quantization=mode).quantization == mode
+        assert ChatConfig(quantization=mode).quantization == mode
+
     @patch(
         "builtins.open",
         new_callable=mock_open,
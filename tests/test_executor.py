@@ -4,34 +4,38 @@ Tests for txgemma.executor module.
 Tests the tool execution logic with mocked models.
 """
 
+import asyncio
+import threading
 from unittest.mock import Mock, patch
 
 import pytest
 
-from txgemma.executor import execute_chat, execute_tool
+from txgemma.executor import (
+    PredictionBatcher,
+    execute_chat,
+    execute_chat_async,
+    execute_tool,
+    execute_tool_async,
+)
 
 
 class TestExecuteToolMocked:
-    """Test execute_tool with mocked dependencies."""
+    """Test execute_tool with injected mock dependencies."""
 
-    @patch("txgemma.executor.get_loader")
-    @patch("txgemma.executor.get_predict_model")
-    def test_execute_tool_success(self, mock_get_model, mock_get_loader):
+    def test_execute_tool_success(self):
         """Test successful tool execution."""
         # Mock loader
         mock_loader = Mock()
         mock_template = Mock()
         mock_template.format.return_value = "Formatted prompt"
         mock_loader.get.return_value = mock_template
-        mock_get_loader.return_value = mock_loader
 
         # Mock model
         mock_model = Mock()
         mock_model.generate.return_value = "Model result"
-        mock_get_model.return_value = mock_model
 
         # Execute
-        result = execute_tool("test_tool", {"param": "value"})
+        result = execute_tool("test_tool", {"param": "value"}, loader=mock_loader, model=mock_model)
 
         # Verify
         assert result == "Model result"
@@ -40,68 +44,68 @@ class TestExecuteToolMocked:
         mock_model.generate.assert_called_once_with("Formatted prompt", max_new_tokens=64)
 
     @patch("txgemma.executor.get_loader")
-    def test_execute_tool_unknown_tool(self, mock_get_loader):
+    @patch("txgemma.executor.get_predict_model")
+    def test_execute_tool_defaults_to_shared_dependencies(self, mock_get_model, mock_get_loader):
+        """Test that the shared loader and predict model are used when none are injected."""
+        mock_get_loader.return_value.get.return_value.format.return_value = "Formatted prompt"
+        mock_get_model.return_value.generate.return_value = "Model result"
+
+        assert execute_tool("test_tool", {"param": "value"}) == "Model result"
+        mock_get_loader.assert_called_once_with()
+        mock_get_model.assert_called_once_with()
+
+    def test_execute_tool_unknown_tool(self):
         """Test execution with unknown tool name."""
         mock_loader = Mock()
         mock_loader.get.side_effect = KeyError("not found")
-        mock_get_loader.return_value = mock_loader
 
         with pytest.raises(KeyError, match="Unknown tool"):
-            execute_tool("unknown_tool", {})
+            execute_tool("unknown_tool", {}, loader=mock_loader, model=Mock())
 
-    @patch("txgemma.executor.get_loader")
-    @patch("txgemma.executor.get_predict_model")
-    def test_execute_tool_invalid_arguments(self, mock_get_model, mock_get_loader):
+    def test_execute_tool_invalid_arguments(self):
         """Test execution with invalid arguments."""
         # Mock loader
         mock_loader = Mock()
         mock_template = Mock()
         mock_template.format.side_effect = ValueError("Missing required")
         mock_loader.get.return_value = mock_template
-        mock_get_loader.return_value = mock_loader
 
         with pytest.raises(ValueError, match="Invalid arguments"):
-            execute_tool("test_tool", {"wrong": "param"})
+            execute_tool("test_tool", {"wrong": "param"}, loader=mock_loader, model=Mock())
 
-    @patch("txgemma.executor.get_loader")
-    @patch("txgemma.executor.get_predict_model")
-    def test_execute_tool_model_failure(self, mock_get_model, mock_get_loader):
+    def test_execute_tool_model_failure(self):
         """Test execution when model generation fails."""
         # Mock loader
         mock_loader = Mock()
         mock_template = Mock()
         mock_template.format.return_value = "Formatted prompt"
         mock_loader.get.return_value = mock_template
-        mock_get_loader.return_value = mock_loader
 
         # Mock model to fail
         mock_model = Mock()
         mock_model.generate.side_effect = RuntimeError("GPU error")
-        mock_get_model.return_value = mock_model
 
         with pytest.raises(RuntimeError, match="Model generation failed"):
-            execute_tool("test_tool", {"param": "value"})
+            execute_tool("test_tool", {"param": "value"}, loader=mock_loader, model=mock_model)
 
-    @patch("txgemma.executor.get_loader")
-    @patch("txgemma.executor.get_predict_model")
-    def test_execute_tool_with_complex_params(self, mock_get_model, mock_get_loader):
+    def test_execute_tool_with_complex_params(self):
         """Test execution with multiple parameters."""
         # Mock loader
         mock_loader = Mock()
         mock_template = Mock()
         mock_template.format.return_value = "Complex prompt"
         mock_loader.get.return_value = mock_template
-        mock_get_loader.return_value = mock_loader
 
         # Mock model
         mock_model = Mock()
         mock_model.generate.return_value = "Complex result"
-        mock_get_model.return_value = mock_model
 
         # Execute with multiple params
         result = execute_tool(
             "complex_tool",
             {"Drug SMILES": "CC(=O)O", "Target sequence": "MKTAYIAK", "Trial phase": "Phase 3"},
+            loader=mock_loader,
+            model=mock_model,
         )
 
         assert result == "Complex result"
@@ -110,23 +114,19 @@ class TestExecuteToolMocked:
             **{"Drug SMILES": "CC(=O)O", "Target sequence": "MKTAYIAK", "Trial phase": "Phase 3"}
         )
 
-    @patch("txgemma.executor.get_loader")
-    @patch("txgemma.executor.get_predict_model")
-    def test_execute_tool_strips_result(self, mock_get_model, mock_get_loader):
+    def test_execute_tool_strips_result(self):
         """Test that result is stripped of whitespace."""
         # Mock loader
         mock_loader = Mock()
         mock_template = Mock()
         mock_template.format.return_value = "Prompt"
         mock_loader.get.return_value = mock_template
-        mock_get_loader.return_value = mock_loader
 
         # Mock model returns result with whitespace
         mock_model = Mock()
         mock_model.generate.return_value = "  Result with spaces  \n"
-        mock_get_model.return_value = mock_model
 
-        result = execute_tool("test_tool", {"param": "value"})
+        result = execute_tool("test_tool", {"param": "value"}, loader=mock_loader, model=mock_model)
 
         # Should be stripped
         assert result == "Result with spaces"
@@ -190,6 +190,110 @@ class TestExecuteChatMocked:
         mock_model.generate.assert_called_once_with("")
 
 
+class TestExecuteToolAsync:
+    """Test execute_tool_async request batching."""
+
+    @patch("txgemma.executor._prediction_batcher", new_callable=PredictionBatcher)
+    @patch("txgemma.executor.get_loader")
+    @patch("txgemma.executor.get_predict_model")
+    async def test_concurrent_calls_share_one_batch(
+        self, mock_get_model, mock_get_loader, mock_batcher
+    ):
+        """Test that concurrent calls are served by a single batched model call."""
+        mock_loader = Mock()
+        mock_template = Mock()
+        mock_template.format.side_effect = lambda **kw: f"Prompt {kw['param']}"
+        mock_loader.get.return_value = mock_template
+        mock_get_loader.return_value = mock_loader
+
+        mock_model = Mock()
+        mock_model.generate_batch.return_value = [" Result a ", "Result b\n"]
+        mock_get_model.return_value = mock_model
+
+        results = await asyncio.gather(
+            execute_tool_async("test_tool", {"param": "a"}),
+            execute_tool_async("test_tool", {"param": "b"}),
+        )
+
+        assert results == ["Result a", "Result b"]
+        mock_model.generate_batch.assert_called_once_with(
+            ["Prompt a", "Prompt b"], max_new_tokens=64
+        )
+        mock_model.generate.assert_not_called()
+
+    @patch("txgemma.executor._prediction_batcher", new_callable=PredictionBatcher)
+    @patch("txgemma.executor.get_loader")
+    @patch("txgemma.executor.get_predict_model")
+    async def test_single_call_model_failure(self, mock_get_model, mock_get_loader, mock_batcher):
+        """Test that a lone request uses generate and surfaces model errors."""
+        mock_loader = Mock()
+        mock_template = Mock()
+        mock_template.format.return_value = "Prompt"
+        mock_loader.get.return_value = mock_template
+        mock_get_loader.return_value = mock_loader
+
+        mock_model = Mock()
+        mock_model.generate.side_effect = RuntimeError("GPU error")
+        mock_get_model.return_value = mock_model
+
+        with pytest.raises(RuntimeError, match="Model generation failed"):
+            await execute_tool_async("test_tool", {"param": "value"})
+
+        mock_model.generate.assert_called_once_with("Prompt", max_new_tokens=64)
+
+    @patch("txgemma.executor.get_predict_model")
+    async def test_batch_failure_outside_model_call(self, mock_get_model):
+        """Test that a failing model lookup fails the batch and keeps the worker alive."""
+        batcher = PredictionBatcher()
+        mock_model = Mock()
+        mock_model.generate.return_value = "Result"
+        mock_get_model.side_effect = [RuntimeError("Could not load model"), mock_model]
+
+        with pytest.raises(RuntimeError, match="Could not load model"):
+            await asyncio.wait_for(batcher.submit("Prompt a"), timeout=1)
+
+        assert await asyncio.wait_for(batcher.submit("Prompt b"), timeout=1) == "Result"
+
+    @patch("txgemma.executor.get_predict_model")
+    async def test_batch_result_count_mismatch(self, mock_get_model):
+        """Test that a short batch result fails every request instead of hanging."""
+        batcher = PredictionBatcher()
+        mock_model = Mock()
+        mock_model.generate_batch.return_value = ["Only one"]
+        mock_get_model.return_value = mock_model
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                batcher.submit("Prompt a"), batcher.submit("Prompt b"), return_exceptions=True
+            ),
+            timeout=1,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert "1 result(s) for 2 prompt(s)" in str(results[0])
+
+
+class TestExecuteChatAsync:
+    """Test async chat execution."""
+
+    @patch("txgemma.executor.execute_chat")
+    async def test_runs_off_the_event_loop_thread(self, mock_execute_chat):
+        """Test that the sync chat call runs in a worker thread."""
+        threads = []
+
+        def fake_chat(question):
+            threads.append(threading.current_thread())
+            return f"Answer to {question}"
+
+        mock_execute_chat.side_effect = fake_chat
+
+        result = await execute_chat_async("What is toxicity?")
+
+        assert result == "Answer to What is toxicity?"
+        mock_execute_chat.assert_called_once_with("What is toxicity?")
+        assert threads[0] is not threading.current_thread()
+
+
 class TestExecuteToolLogging:
     """Test logging behavior in execute_tool."""
 
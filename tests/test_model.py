@@ -6,174 +6,163 @@ Run with: pytest tests/test_model.py --run-gpu
 """
 
 import pytest
-import torch
 
-from txgemma.model import TxGemmaChatModel, TxGemmaPredictModel, get_chat_model, get_predict_model
+from txgemma.model import (
+    TxGemmaChatModel,
+    TxGemmaPredictModel,
+    get_chat_model,
+    get_predict_model,
+)
 
 # Mark all tests in this file as requiring GPU
 pytestmark = pytest.mark.gpu
 
 
-class TestTxGemmaPredictModelUnit:
-    """Unit tests for predict model that don't require model loading."""
-
-    def setup_method(self):
-        """Reset singleton before each test."""
-        TxGemmaPredictModel._instance = None
-
-    def test_init_default(self):
-        """Test model initialization with defaults."""
-        model = TxGemmaPredictModel()
-
-        assert model.model_name == "google/txgemma-2b-predict"
-        assert model.max_new_tokens == 64
-        assert not model.is_loaded
-        assert model.tokenizer is None
-        assert model.model is None
-
-    def test_init_custom(self):
-        """Test model initialization with custom parameters."""
-        model = TxGemmaPredictModel(model_name="google/txgemma-9b-predict", max_new_tokens=128)
-
-        assert model.model_name == "google/txgemma-9b-predict"
-        assert model.max_new_tokens == 128
-        assert not model.is_loaded
-
-    def test_singleton_pattern(self):
-        """Test that TxGemmaPredictModel uses singleton pattern."""
-        model1 = TxGemmaPredictModel()
-        model2 = TxGemmaPredictModel()
-
-        assert model1 is model2
-
-    def test_get_predict_model_singleton(self):
-        """Test that get_predict_model returns singleton."""
-        model1 = get_predict_model()
-        model2 = get_predict_model()
-
-        assert model1 is model2
-
-    def test_is_loaded_before_load(self):
-        """Test is_loaded property before loading."""
-        model = TxGemmaPredictModel()
-        assert not model.is_loaded
-
-
-class TestTxGemmaChatModelUnit:
-    """Unit tests for chat model that don't require model loading."""
-
-    def setup_method(self):
+MODEL_CASES = [
+    pytest.param(
+        TxGemmaPredictModel,
+        get_predict_model,
+        "google/txgemma-2b-predict",
+        64,
+        "google/txgemma-9b-predict",
+        id="predict",
+    ),
+    pytest.param(
+        TxGemmaChatModel,
+        get_chat_model,
+        "google/txgemma-9b-chat",
+        100,
+        "google/txgemma-27b-chat",
+        id="chat",
+    ),
+]
+
+
+@pytest.mark.parametrize("cls,getter,default_name,default_tokens,custom_name", MODEL_CASES)
+class TestTxGemmaModelUnit:
+    """Unit tests for predict and chat models that don't require model loading."""
+
+    @pytest.fixture(autouse=True)
+    def reset_singleton(self, cls):
         """Reset singleton before each test."""
-        TxGemmaChatModel._instance = None
+        cls._instance = None
 
-    def test_init_default(self):
+    def test_init_default(self, cls, getter, default_name, default_tokens, custom_name):
         """Test model initialization with defaults."""
-        model = TxGemmaChatModel()
+        model = cls()
 
-        assert model.model_name == "google/txgemma-9b-chat"
-        assert model.max_new_tokens == 100
+        assert model.model_name == default_name
+        assert model.max_new_tokens == default_tokens
         assert not model.is_loaded
         assert model.tokenizer is None
         assert model.model is None
 
-    def test_init_custom(self):
+    def test_init_custom(self, cls, getter, default_name, default_tokens, custom_name):
         """Test model initialization with custom parameters."""
-        model = TxGemmaChatModel(model_name="google/txgemma-27b-chat", max_new_tokens=300)
+        model = cls(model_name=custom_name, max_new_tokens=300)
 
-        assert model.model_name == "google/txgemma-27b-chat"
+        assert model.model_name == custom_name
         assert model.max_new_tokens == 300
         assert not model.is_loaded
 
-    def test_singleton_pattern(self):
-        """Test that TxGemmaChatModel uses singleton pattern."""
-        model1 = TxGemmaChatModel()
-        model2 = TxGemmaChatModel()
+    def test_singleton_pattern(self, cls, getter, default_name, default_tokens, custom_name):
+        """Test that the model class uses singleton pattern."""
+        model1 = cls()
+        model2 = cls()
 
         assert model1 is model2
 
-    def test_get_chat_model_singleton(self):
-        """Test that get_chat_model returns singleton."""
-        model1 = get_chat_model()
-        model2 = get_chat_model()
+    def test_getter_singleton(self, cls, getter, default_name, default_tokens, custom_name):
+        """Test that get_predict_model/get_chat_model return the class singleton."""
+        model1 = getter()
+        model2 = getter()
 
         assert model1 is model2
+        assert model1 is cls()
 
-    def test_is_loaded_before_load(self):
+    def test_is_loaded_before_load(self, cls, getter, default_name, default_tokens, custom_name):
         """Test is_loaded property before loading."""
-        model = TxGemmaChatModel()
+        model = cls()
         assert not model.is_loaded
 
 
 class TestTxGemmaPredictModelIntegration:
     """Integration tests for predict model that require GPU."""
 
-    @pytest.fixture(scope="class")
-    def loaded_model(self):
-        """Fixture that loads predict model once for all tests in class."""
-        model = TxGemmaPredictModel()
-        model.load()
-        yield model
-        model.unload()
+    @pytest.fixture(autouse=True, scope="class")
+    def warmup(self, loaded_predict_model):
+        """Run one generation so tests observe steady-state kernels and caches."""
+        import torch
 
-    def test_load_model(self, loaded_model):
+        loaded_predict_model.generate("Question: Warm up.\nAnswer:", max_new_tokens=4)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+
+    def test_load_model(self, loaded_predict_model):
         """Test model loading."""
-        assert loaded_model.is_loaded
-        assert loaded_model.tokenizer is not None
-        assert loaded_model.model is not None
+        assert loaded_predict_model.is_loaded
+        assert loaded_predict_model.tokenizer is not None
+        assert loaded_predict_model.model is not None
 
-    def test_model_device(self, loaded_model):
+    def test_model_device(self, loaded_predict_model):
         """Test that model is on correct device."""
+        import torch
+
         # Should be on GPU if available
         if torch.cuda.is_available():
-            assert "cuda" in str(loaded_model.model.device)
+            assert "cuda" in str(loaded_predict_model.model.device)
         elif torch.backends.mps.is_available():
-            assert "mps" in str(loaded_model.model.device)
+            assert "mps" in str(loaded_predict_model.model.device)
 
-    def test_generate_simple(self, loaded_model):
+    def test_generate_simple(self, loaded_predict_model):
         """Test simple text generation."""
         prompt = "Question: What is 2+2?\nAnswer:"
-        result = loaded_model.generate(prompt, max_new_tokens=10)
+        result = loaded_predict_model.generate(prompt, max_new_tokens=10)
 
         assert isinstance(result, str)
         assert len(result) > 0
 
-    def test_generate_with_custom_tokens(self, loaded_model):
+    def test_generate_with_custom_tokens(self, loaded_predict_model):
         """Test generation with custom max_new_tokens."""
         prompt = "Question: Explain photosynthesis.\nAnswer:"
-        result = loaded_model.generate(prompt, max_new_tokens=50)
+        result = loaded_predict_model.generate(prompt, max_new_tokens=50)
 
         assert isinstance(result, str)
         assert len(result) > 0
 
-    def test_generate_deterministic(self, loaded_model):
+    def test_generate_deterministic(self, loaded_predict_model):
         """Test that generation is deterministic (do_sample=False)."""
+        import torch
+
         prompt = "Question: What is the capital of France?\nAnswer:"
 
-        result1 = loaded_model.generate(prompt, max_new_tokens=20)
-        result2 = loaded_model.generate(prompt, max_new_tokens=20)
+        # Warm up so first-call kernel selection can't differ from the compared runs
+        _ = loaded_predict_model.generate(prompt, max_new_tokens=20)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+
+        result1 = loaded_predict_model.generate(prompt, max_new_tokens=20)
+        result2 = loaded_predict_model.generate(prompt, max_new_tokens=20)
 
         # Should be identical with do_sample=False
         assert result1 == result2
 
-    def test_generate_with_smiles(self, loaded_model):
+    def test_generate_with_smiles(self, loaded_predict_model):
         """Test generation with SMILES input (typical TDC use case)."""
         prompt = """Instruction: Predict the toxicity of the given drug molecule.
 Context: Drug toxicity prediction is critical for early-stage drug discovery.
 Question: Given the drug SMILES 'CC(=O)OC1=CC=CC=C1C(=O)O', predict its toxicity level.
 Answer:"""
 
-        result = loaded_model.generate(prompt, max_new_tokens=64)
+        result = loaded_predict_model.generate(prompt, max_new_tokens=64)
 
         assert isinstance(result, str)
         assert len(result) > 0
         assert len(result.strip()) > 0
 
-    def test_unload_and_reload(self):
+    def test_unload_and_reload(self, loaded_predict_model):
         """Test unloading and reloading predict model."""
-        model = TxGemmaPredictModel()
-
-        # Load
-        model.load()
+        model = loaded_predict_model
         assert model.is_loaded
 
         # Unload
@@ -188,21 +177,10 @@ Answer:"""
         result = model.generate("Test prompt", max_new_tokens=10)
         assert isinstance(result, str)
 
-        # Cleanup
-        model.unload()
-
 
 class TestTxGemmaChatModelIntegration:
     """Integration tests for chat model that require GPU."""
 
-    @pytest.fixture(scope="class")
-    def loaded_chat_model(self):
-        """Fixture that loads chat model once for all tests in class."""
-        model = TxGemmaChatModel()
-        model.load()
-        yield model
-        model.unload()
-
     def test_load_chat_model(self, loaded_chat_model):
         """Test chat model loading."""
         assert loaded_chat_model.is_loaded
@@ -211,6 +189,8 @@ class TestTxGemmaChatModelIntegration:
 
     def test_chat_model_device(self, loaded_chat_model):
         """Test that chat model is on correct device."""
+        import torch
+
         if torch.cuda.is_available():
             assert "cuda" in str(loaded_chat_model.model.device)
         elif torch.backends.mps.is_available():
@@ -236,20 +216,24 @@ class TestTxGemmaChatModelIntegration:
 
     def test_chat_deterministic(self, loaded_chat_model):
         """Test that chat generation is deterministic."""
+        import torch
+
         prompt = "What is toxicity?"
 
+        # Warm up so first-call kernel selection can't differ from the compared runs
+        _ = loaded_chat_model.generate(prompt, max_new_tokens=50)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+
         result1 = loaded_chat_model.generate(prompt, max_new_tokens=50)
         result2 = loaded_chat_model.generate(prompt, max_new_tokens=50)
 
         # Should be identical with do_sample=False
         assert result1 == result2
 
-    def test_unload_and_reload_chat(self):
+    def test_unload_and_reload_chat(self, loaded_chat_model):
         """Test unloading and reloading chat model."""
-        model = TxGemmaChatModel()
-
-        # Load
-        model.load()
+        model = loaded_chat_model
         assert model.is_loaded
 
         # Unload
@@ -264,9 +248,6 @@ class TestTxGemmaChatModelIntegration:
         result = model.generate("What is a drug?", max_new_tokens=20)
         assert isinstance(result, str)
 
-        # Cleanup
-        model.unload()
-
 
 class TestPredictModelEdgeCases:
     """Test edge cases and error handling for predict model."""
@@ -287,29 +268,17 @@ class TestPredictModelEdgeCases:
         with pytest.raises(RuntimeError, match="Could not load TxGemma predict model"):
             model.load()
 
-    def test_generate_empty_prompt(self):
+    def test_generate_empty_prompt(self, loaded_predict_model):
         """Test generation with empty prompt."""
-        model = TxGemmaPredictModel()
-        model.load()
-
-        try:
-            result = model.generate("")
-            assert isinstance(result, str)
-        finally:
-            model.unload()
+        result = loaded_predict_model.generate("")
+        assert isinstance(result, str)
 
-    def test_generate_very_long_prompt(self):
+    def test_generate_very_long_prompt(self, loaded_predict_model):
         """Test generation with very long prompt."""
-        model = TxGemmaPredictModel()
-        model.load()
+        long_prompt = "Question: " + " ".join(["word"] * 1000) + "\nAnswer:"
+        result = loaded_predict_model.generate(long_prompt, max_new_tokens=10)
 
-        try:
-            long_prompt = "Question: " + " ".join(["word"] * 1000) + "\nAnswer:"
-            result = model.generate(long_prompt, max_new_tokens=10)
-
-            assert isinstance(result, str)
-        finally:
-            model.unload()
+        assert isinstance(result, str)
 
 
 class TestChatModelEdgeCases:
@@ -331,13 +300,7 @@ class TestChatModelEdgeCases:
         with pytest.raises(RuntimeError, match="Could not load TxGemma chat model"):
             model.load()
 
-    def test_generate_chat_empty_prompt(self):
+    def test_generate_chat_empty_prompt(self, loaded_chat_model):
         """Test chat generation with empty prompt."""
-        model = TxGemmaChatModel()
-        model.load()
-
-        try:
-            result = model.generate("")
-            assert isinstance(result, str)
-        finally:
-            model.unload()
+        result = loaded_chat_model.generate("")
+        assert isinstance(result, str)
@@ -0,0 +1,105 @@
+"""
+Unit tests for txgemma.model that run without a GPU or model download.
+
+Model weights and tokenizers are mocked; GPU integration tests live in test_model.py.
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+import torch
+
+from txgemma.model import TxGemmaChatModel, TxGemmaPredictModel, _quantization_config
+
+
+@pytest.mark.parametrize("cls", [TxGemmaPredictModel, TxGemmaChatModel], ids=["predict", "chat"])
+class TestLoadCompile:
+    """Tests for optional torch.compile on load."""
+
+    @pytest.fixture(autouse=True)
+    def reset_singleton(self, cls):
+        """Reset singleton around each test."""
+        cls._instance = None
+        yield
+        cls._instance = None
+
+    @pytest.mark.parametrize("env_value,compiled", [("0", False), ("1", True)])
+    def test_load_compiles_when_enabled(self, cls, env_value, compiled):
+        """Test that load() compiles and warms up only with TXGEMMA_COMPILE=1."""
+        with (
+            patch.dict(os.environ, {"TXGEMMA_COMPILE": env_value}),
+            patch("transformers.AutoTokenizer.from_pretrained"),
+            patch("transformers.AutoModelForCausalLM.from_pretrained"),
+            patch("torch.compile") as mock_compile,
+            patch.object(cls, "generate") as mock_generate,
+        ):
+            model = cls()
+            model.load()
+
+        assert mock_compile.called is compiled
+        assert mock_generate.called is compiled
+
+
+class TestQuantizationConfig:
+    """Tests for bitsandbytes quantization settings."""
+
+    def test_none_loads_full_precision(self):
+        """Test that no quantization passes no config to from_pretrained."""
+        assert _quantization_config(None) is None
+
+    def test_int8(self):
+        """Test 8-bit quantization config."""
+        config = _quantization_config("int8")
+        assert config.load_in_8bit
+
+    def test_nf4(self):
+        """Test 4-bit NormalFloat quantization config."""
+        config = _quantization_config("nf4")
+        assert config.load_in_4bit
+        assert config.bnb_4bit_quant_type == "nf4"
+        assert config.bnb_4bit_use_double_quant
+
+    def test_unknown_mode(self):
+        """Test that unknown modes are rejected."""
+        with pytest.raises(ValueError, match="Unknown quantization"):
+            _quantization_config("int3")
+
+
+class TestGenerateBatch:
+    """Tests for batched prediction on a mocked model."""
+
+    @pytest.fixture
+    def model(self):
+        """Predict model with a mocked tokenizer and weights."""
+        TxGemmaPredictModel._instance = None
+        model = TxGemmaPredictModel()
+        model.tokenizer = MagicMock(padding_side="right")
+        model.model = MagicMock(device="cpu")
+        yield model
+        TxGemmaPredictModel._instance = None
+
+    def test_left_pads_without_changing_shared_tokenizer(self, model):
+        """Test that the batch is left-padded and the tokenizer setting is restored."""
+        sides = []
+
+        def tokenize(prompts, **kwargs):
+            sides.append(model.tokenizer.padding_side)
+            return {"input_ids": torch.zeros((len(prompts), 3), dtype=torch.long)}
+
+        model.tokenizer.side_effect = tokenize
+        model.model.generate.return_value = torch.zeros((2, 5), dtype=torch.long)
+        model.tokenizer.decode.side_effect = [" a ", "b\n"]
+
+        assert model.generate_batch(["Prompt a", "Prompt b"]) == ["a", "b"]
+        assert sides == ["left"]
+        assert model.tokenizer.padding_side == "right"
+
+    def test_restores_padding_side_on_error(self, model):
+        """Test that a tokenizer failure still restores the padding side."""
+        model.tokenizer.side_effect = ValueError("bad input")
+
+        with pytest.raises(ValueError, match="bad input"):
+            model.generate_batch(["Prompt"])
+
+        assert model.tokenizer.padding_side == "right"
@@ -3,7 +3,10 @@ Tests for txgemma.prompts module.
 """
 
 import json
+import os
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -73,6 +76,11 @@ class TestPromptTemplate:
         assert isinstance(required, set)
         assert required == {"Drug SMILES", "Target sequence"}
 
+        # Callers get a copy; mutating it must not change the template
+        required.add("Extra")
+        assert template.required_inputs == {"Drug SMILES", "Target sequence"}
+        assert template.format(**{"Drug SMILES": "CC", "Target sequence": "MK"})
+
     def test_has_placeholder(self):
         """Test has_placeholder method."""
         template = PromptTemplate("test", "{Drug SMILES} and {Target sequence}")
@@ -97,6 +105,33 @@ class TestPromptTemplate:
         with pytest.raises(ValueError, match="Missing required placeholders"):
             template.format(**{"Drug SMILES": "CC(=O)O"})
 
+    def test_format_matches_str_format(self):
+        """Test that precompiled rendering matches str.format, escaped braces included."""
+        text = "Drug: {Drug SMILES} {{literal}} Phase {Trial phase}, again {Drug SMILES}"
+        values = {"Drug SMILES": "CC(=O)O", "Trial phase": 3}
+        template = PromptTemplate("test", text)
+
+        # Escaped braces are literal text, not a required input
+        assert template.placeholders == ["Drug SMILES", "Trial phase"]
+        assert template._segments is not None
+        assert template.format(**values) == text.format(**values)
+
+    def test_format_falls_back_to_str_format(self):
+        """Test that templates needing full str.format semantics keep its behavior."""
+        # Format spec: rendered by str.format itself
+        template = PromptTemplate("test", "Value: {x:>5}")
+        assert template.placeholders == ["x"]
+        assert template._segments is None
+        assert template.format(x="ab") == "Value:    ab"
+
+        # Stray closing brace: placeholders come from the regex and
+        # str.format's error surfaces at render time
+        template = PromptTemplate("test", "Drug: {Drug SMILES} }")
+        assert template.placeholders == ["Drug SMILES"]
+        assert template._segments is None
+        with pytest.raises(ValueError, match="Single '}'"):
+            template.format(**{"Drug SMILES": "CC(=O)O"})
+
     def test_get_description_from_metadata(self):
         """Test description from metadata."""
         template = PromptTemplate(
@@ -152,6 +187,34 @@ class TestPromptTemplate:
         assert "'test'" in repr_str
         assert "Drug SMILES" in repr_str
 
+    def test_uses_slots(self):
+        """Test that templates carry no per-instance __dict__."""
+        template = PromptTemplate("test", "{Drug SMILES}")
+
+        assert not hasattr(template, "__dict__")
+        with pytest.raises(AttributeError):
+            template.extra = "value"
+
+    def test_empty_metadata_is_shared_and_read_only(self):
+        """Test that metadata-less templates share one read-only empty mapping."""
+        first = PromptTemplate("first", "{Drug SMILES}")
+        second = PromptTemplate("second", "{Drug SMILES}", metadata={})
+
+        assert first.metadata is second.metadata
+        with pytest.raises(TypeError):
+            first.metadata["category"] = "test"
+
+    def test_metadata_is_read_only_snapshot(self):
+        """Test that metadata is copied and read-only like the shared empty mapping."""
+        metadata = {"category": "test"}
+        template = PromptTemplate("test", "{Drug SMILES}", metadata=metadata)
+        metadata["category"] = "changed"
+
+        assert template.metadata == {"category": "test"}
+        assert type(template.metadata) is type(PromptTemplate("other", "{x}").metadata)
+        with pytest.raises(TypeError):
+            template.metadata["category"] = "other"
+
 
 # =============================================================================
 # PromptLoader Tests
@@ -180,6 +243,42 @@ class TestPromptLoader:
         assert loader.filename == "custom.json"
         assert loader.local_override == Path("test.json")
 
+    def test_prefer_cache_uses_cached_file(self, tmp_path):
+        """Test that a cached Hub file is used without a blocking download."""
+        prompts_file = tmp_path / "cached_prompts.json"
+        prompts_file.write_text(json.dumps({"test_tool": "Question: {Drug SMILES}?"}))
+
+        with (
+            patch("txgemma.prompts.hf_hub_download", return_value=str(prompts_file)) as mock_dl,
+            patch("txgemma.prompts.threading.Thread") as mock_thread,
+        ):
+            loader = PromptLoader(prefer_cache=True)
+            loader.load()
+
+        assert "test_tool" in loader
+        assert loader.source.startswith("HuggingFace cache")
+        mock_dl.assert_called_once_with(
+            repo_id=loader.hf_repo, filename=loader.filename, local_files_only=True
+        )
+        mock_thread.return_value.start.assert_called_once()
+
+    def test_prefer_cache_falls_back_to_download(self, tmp_path):
+        """Test that a cache miss falls back to a regular download."""
+        prompts_file = tmp_path / "downloaded_prompts.json"
+        prompts_file.write_text(json.dumps({"test_tool": "Question: {Drug SMILES}?"}))
+
+        def fake_download(repo_id, filename, local_files_only=False):
+            if local_files_only:
+                raise FileNotFoundError("not cached")
+            return str(prompts_file)
+
+        with patch("txgemma.prompts.hf_hub_download", side_effect=fake_download):
+            loader = PromptLoader(prefer_cache=True)
+            loader.load()
+
+        assert "test_tool" in loader
+        assert loader.source.startswith("HuggingFace:")
+
     def test_load_from_local_simple_format(self, tmp_path):
         """Test loading from local file with simple format."""
         prompts_file = tmp_path / "test_prompts.json"
@@ -248,6 +347,22 @@ class TestPromptLoader:
         with pytest.raises(ValueError, match="Invalid JSON"):
             loader.load()
 
+    def test_load_with_stdlib_json_fallback(self, tmp_path):
+        """Test that loading works and rejects bad JSON without orjson installed."""
+        prompts_file = tmp_path / "test_prompts.json"
+        prompts_file.write_text(json.dumps({"test_tool": "Question: {Drug SMILES}? Ω"}))
+        bad_file = tmp_path / "bad.json"
+        bad_file.write_text("{ invalid json }")
+
+        with patch("txgemma.prompts._json_loads", json.loads):
+            loader = PromptLoader(local_override=prompts_file)
+            loader.load()
+
+            with pytest.raises(ValueError, match="Invalid JSON"):
+                PromptLoader(local_override=bad_file).load()
+
+        assert loader.get("test_tool").template == "Question: {Drug SMILES}? Ω"
+
     def test_load_invalid_top_level_type(self, tmp_path):
         """Test error when top-level JSON is not a dict."""
         prompts_file = tmp_path / "bad.json"
@@ -317,6 +432,28 @@ class TestPromptLoader:
         assert len(loader) == 2
         assert "tool2" in loader
 
+    def test_reload_skips_unchanged_file(self, tmp_path):
+        """Test that reload() re-parses only when the file's mtime or size changed."""
+        prompts_file = tmp_path / "test.json"
+        prompts_file.write_text(json.dumps({"tool1": "Question: {input}"}))
+
+        loader = PromptLoader(local_override=prompts_file)
+        loader.load()
+
+        with patch.object(loader, "_load_json", wraps=loader._load_json) as mock_load_json:
+            loader.reload()
+            mock_load_json.assert_not_called()
+
+            # Same size, newer mtime: still re-parsed
+            prompts_file.write_text(json.dumps({"tool2": "Question: {input}"}))
+            stat = prompts_file.stat()
+            os.utime(prompts_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            loader.reload()
+            mock_load_json.assert_called_once()
+
+        assert "tool2" in loader
+        assert "tool1" not in loader
+
     def test_get_existing(self, tmp_path):
         """Test getting an existing template."""
         prompts_file = tmp_path / "test.json"
@@ -461,6 +598,17 @@ class TestPromptLoader:
         usage = loader.placeholder_usage("Nonexistent")
         assert usage == set()
 
+    def test_placeholder_usage_is_immutable(self, tmp_path):
+        """Test that placeholder_usage serves the frozen index entry without copying."""
+        prompts_file = tmp_path / "test.json"
+        prompts_file.write_text(json.dumps({"tool1": "{Drug SMILES}", "tool2": "{Drug SMILES}"}))
+
+        loader = PromptLoader(local_override=prompts_file)
+
+        usage = loader.placeholder_usage("Drug SMILES")
+        assert isinstance(usage, frozenset)
+        assert usage is loader.placeholder_usage("Drug SMILES")
+
     def test_placeholder_stats(self, tmp_path):
         """Test placeholder_stats method."""
         prompts_file = tmp_path / "test.json"
@@ -540,6 +688,25 @@ class TestPromptLoader:
         # Should match both Drug SMILES and Product SMILES
         assert set(filtered.keys()) == {"tool1", "tool2"}
 
+    def test_filter_by_placeholder_fuzzy_keeps_catalog_order(self, tmp_path):
+        """Test that fuzzy matches come back in catalog order, each template once."""
+        prompts_file = tmp_path / "test.json"
+        prompts_file.write_text(
+            json.dumps(
+                {
+                    "tool1": "{Product SMILES}",
+                    "tool2": "{Target sequence}",
+                    "tool3": "{Drug SMILES} and {Reactant SMILES}",
+                    "tool4": "{Drug SMILES}",
+                }
+            )
+        )
+
+        loader = PromptLoader(local_override=prompts_file)
+        filtered = loader.filter_by_placeholder("SMILES", exact=False)
+
+        assert list(filtered) == ["tool1", "tool3", "tool4"]
+
     def test_filter_by_placeholders_all(self, tmp_path):
         """Test filtering with ALL placeholders required."""
         prompts_file = tmp_path / "test.json"
@@ -581,6 +748,24 @@ class TestPromptLoader:
         # tool1, tool2, tool3 have at least one
         assert set(filtered.keys()) == {"tool1", "tool2", "tool3"}
 
+    def test_filter_by_placeholders_edge_cases(self, tmp_path):
+        """Test empty and unknown placeholder lists."""
+        prompts_file = tmp_path / "test.json"
+        prompts_file.write_text(
+            json.dumps({"tool1": "{Drug SMILES}", "tool2": "{Target sequence}"})
+        )
+
+        loader = PromptLoader(local_override=prompts_file)
+
+        # No required placeholders: every template qualifies for ALL, none for ANY
+        assert list(loader.filter_by_placeholders([], match_all=True)) == ["tool1", "tool2"]
+        assert loader.filter_by_placeholders([], match_all=False) == {}
+
+        # Unknown placeholders match nothing with ALL, and are ignored with ANY
+        placeholders = ["Drug SMILES", "Unknown"]
+        assert loader.filter_by_placeholders(placeholders, match_all=True) == {}
+        assert list(loader.filter_by_placeholders(placeholders, match_all=False)) == ["tool1"]
+
     def test_smiles_prompts(self, tmp_path):
         """Test smiles_prompts convenience method."""
         prompts_file = tmp_path / "test.json"
@@ -692,6 +877,23 @@ class TestGlobalLoader:
         assert loader.filename == "tdc_prompts.json"
         assert loader.local_override is None
 
+    def test_load_parses_once_across_threads(self):
+        """Test that concurrent first load() calls parse the prompts only once."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        loader = PromptLoader()
+
+        def slow_load_json(path=None):
+            time.sleep(0.05)
+            return {"tool": "Question: {Drug SMILES}"}
+
+        with patch.object(loader, "_load_json", side_effect=slow_load_json) as mock_load_json:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                lengths = list(pool.map(lambda _: len(loader), range(8)))
+
+        mock_load_json.assert_called_once()
+        assert lengths == [1] * 8
+
 
 # =============================================================================
 # Regex Tests
@@ -6,7 +6,7 @@ Tests server setup, tool registration, and FastMCP integration.
 
 import json
 import sys
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
@@ -46,8 +46,9 @@ class TestServerIntegration:
         """Test that TOOLS list exists."""
         from server import TOOLS
 
-        # TOOLS should be a list
-        assert isinstance(TOOLS, list)
+        # TOOLS should be an immutable tuple sorted by name
+        assert isinstance(TOOLS, tuple)
+        assert [t.name for t in TOOLS] == sorted(t.name for t in TOOLS)
 
     @pytest.mark.skipif(
         not pytest.importorskip("server").TOOLS,
@@ -82,10 +83,12 @@ class TestServerIntegration:
 class TestResourceEndpoints:
     """Test resource endpoints defined in server."""
 
-    @patch("txgemma.tool_factory.analyze_tools")
+    @patch("server.analyze_tools")
     def test_server_info_resource(self, mock_analyze):
         """Test server_info resource."""
-        from server import server_info
+        from server import _server_info_text, server_info
+
+        _server_info_text.cache_clear()
 
         # Mock analyze_tools
         mock_analyze.return_value = {
@@ -109,10 +112,12 @@ class TestResourceEndpoints:
         assert "TxGemma MCP Server" in result
         assert "Drug SMILES" in result or "703" in result
 
-    @patch("txgemma.tool_factory.analyze_tools")
+    @patch("server.analyze_tools")
     def test_server_stats_resource(self, mock_analyze):
         """Test server_stats resource returns JSON."""
-        from server import server_stats
+        from server import _stats_json, server_stats
+
+        _stats_json.cache_clear()
 
         # Mock analyze_tools
         mock_stats = {
@@ -135,6 +140,21 @@ class TestResourceEndpoints:
         assert parsed["total_tools"] == 703
         assert parsed["total_placeholders"] == 50
 
+    @patch("server.analyze_tools")
+    def test_server_stats_serialized_once(self, mock_analyze):
+        """Test that stats JSON is encoded on first read and reused afterwards."""
+        import server
+
+        mock_analyze.return_value = {"total_tools": 1}
+        server._stats_json.cache_clear()
+
+        first = server._stats_json()
+        second = server._stats_json()
+
+        assert first is second
+        mock_analyze.assert_called_once()
+        server._stats_json.cache_clear()
+
 
 class TestMainEntryPoint:
     """Test main() entry point."""
@@ -309,20 +329,159 @@ class TestToolRegistration:
         assert tool_func.__name__ == "test_tool"
         assert callable(tool_func)
 
-    @patch("server.execute_tool")
-    def test_tool_execution_wrapper(self, mock_execute):
-        """Test that tool execution wrapper calls execute_tool correctly."""
+    @patch("server.execute_tool_async", new_callable=AsyncMock)
+    async def test_tool_execution_wrapper(self, mock_execute):
+        """Test that tool execution wrapper calls execute_tool_async correctly."""
         # Mock successful execution
         mock_execute.return_value = "Prediction result"
 
-        # Call execute_tool
-        from server import execute_tool
+        # Call execute_tool_async
+        from server import execute_tool_async
 
-        _result = execute_tool("test_tool", {"param": "value"})
+        _result = await execute_tool_async("test_tool", {"param": "value"})
 
         # Verify it was called
         mock_execute.assert_called_once_with("test_tool", {"param": "value"})
 
+    @patch("server.execute_tool_async", new_callable=AsyncMock)
+    async def test_tool_dispatcher_runs_named_tool(self, mock_execute):
+        """Test that the shared dispatcher executes the tool it was created for."""
+        from server import ToolDispatcher
+
+        mock_execute.return_value = "Prediction result"
+
+        result = await ToolDispatcher("test_tool").run({"param": "value"})
+
+        assert result == "Prediction result"
+        mock_execute.assert_called_once_with("test_tool", {"param": "value"})
+
+    @patch("server.execute_tool_async", new_callable=AsyncMock)
+    async def test_tool_dispatcher_returns_error_string(self, mock_execute):
+        """Test that dispatcher errors are reported back to the client as text."""
+        from server import ToolDispatcher
+
+        mock_execute.side_effect = KeyError("Unknown tool")
+
+        result = await ToolDispatcher("missing_tool").run({})
+
+        assert result.startswith("ERROR:")
+
+
+class TestRegisteredTools:
+    """Test the FastMCP tools registered for each TDC task."""
+
+    async def test_each_tool_dispatches_to_its_own_name(self):
+        """Test that each registration keeps its own name, description and dispatcher."""
+        import importlib
+
+        import server
+
+        # Other tests reload the module with a mocked FastMCP; start from a real one
+        server = importlib.reload(server)
+
+        if server.config.tools.lazy_registration or not server.TOOL_INDEX:
+            pytest.skip("Per-tool registration disabled or no tools loaded")
+
+        registered = await server.mcp.get_tools()
+
+        for name, tool in server.TOOL_INDEX.items():
+            assert registered[name].fn.__self__.name == name
+            assert registered[name].description.startswith(tool.description)
+            assert registered[name].parameters["required"] == ["params"]
+
+
+class TestCatalogTools:
+    """Test the list/describe/invoke catalog tools used for lazy registration."""
+
+    def test_list_tools_covers_index(self):
+        """Test that every indexed tool is listed once."""
+        from server import TOOL_INDEX, txgemma_list_tools
+
+        lines = txgemma_list_tools().splitlines()
+
+        assert [line.split(":", 1)[0] for line in lines] == list(TOOL_INDEX)
+        # Rendered once and reused
+        assert txgemma_list_tools() is txgemma_list_tools()
+
+    def test_describe_unknown_tool(self):
+        """Test that describing an unknown tool returns an error string."""
+        from server import txgemma_describe_tool
+
+        assert txgemma_describe_tool("no_such_tool").startswith("ERROR:")
+
+    @patch("server.execute_tool_async", new_callable=AsyncMock)
+    async def test_invoke_dispatches_known_tool(self, mock_execute):
+        """Test that invoke runs indexed tools and rejects unknown ones."""
+        from server import TOOL_INDEX, txgemma_invoke
+
+        mock_execute.return_value = "Prediction result"
+
+        with patch.dict(TOOL_INDEX, {"test_tool": Mock()}):
+            result = await txgemma_invoke("test_tool", {"param": "value"})
+
+        assert result == "Prediction result"
+        mock_execute.assert_called_once_with("test_tool", {"param": "value"})
+        assert (await txgemma_invoke("no_such_tool", {})).startswith("ERROR:")
+
+
+class TestBatchTool:
+    """Test the txgemma_batch multi-call tool."""
+
+    @patch("server.execute_tool_async", new_callable=AsyncMock)
+    async def test_batch_runs_calls_in_order(self, mock_execute):
+        """Test that each call is dispatched and results keep call order."""
+        from server import TOOL_INDEX, txgemma_batch
+
+        mock_execute.side_effect = lambda name, args: f"{name}:{args['x']}"
+
+        with patch.dict(TOOL_INDEX, {"tool_a": Mock(), "tool_b": Mock()}):
+            results = await txgemma_batch(
+                [
+                    {"tool_name": "tool_a", "arguments": {"x": 1}},
+                    {"tool_name": "tool_b", "arguments": {"x": 2}},
+                    {"tool_name": "missing", "arguments": {}},
+                ]
+            )
+
+        assert results[:2] == ["tool_a:1", "tool_b:2"]
+        assert results[2].startswith("ERROR:")
+        assert mock_execute.call_count == 2
+
+
+class TestToolsByPlaceholderResource:
+    """Test the projected txgemma://tools/{placeholder} resource."""
+
+    def test_index_matches_tool_schemas(self):
+        """Test that the inverted index lists exactly the tools requiring each placeholder."""
+        from server import _TOOLS_BY_PLACEHOLDER, TOOLS
+
+        for tool in TOOLS:
+            for placeholder in tool.inputSchema["required"]:
+                assert tool in _TOOLS_BY_PLACEHOLDER[placeholder]
+        for placeholder, tools in _TOOLS_BY_PLACEHOLDER.items():
+            assert all(placeholder in t.inputSchema["required"] for t in tools)
+
+    def test_resource_returns_projected_tools(self):
+        """Test that only tools using the placeholder are returned."""
+        import server
+
+        tool = Mock()
+        tool.name = "test_tool"
+        tool.description = "Test tool"
+        tool.inputSchema = {"type": "object", "required": ["Drug SMILES"]}
+
+        # tools_by_placeholder is a FunctionResourceTemplate after decoration
+        handler = getattr(server.tools_by_placeholder, "fn", server.tools_by_placeholder)
+
+        with patch.dict(server._TOOLS_BY_PLACEHOLDER, {"Drug SMILES": [tool]}):
+            result = json.loads(handler("Drug SMILES"))
+            missing = json.loads(handler("No such placeholder"))
+
+        assert result == [
+            {"name": "test_tool", "description": "Test tool", "inputSchema": tool.inputSchema}
+        ]
+        assert missing == []
+
 
 class TestServerConfiguration:
     """Test server configuration and options."""
@@ -400,9 +559,11 @@ class TestToolDescriptionEnhancement:
 
     def test_enhance_description_with_params(self):
         """Test the description enhancement pattern from server."""
-        # Simulate server's description enhancement
-        tool_description = "Base description"
-        tool_schema = {
+        from txgemma.tool_factory import build_tool_description
+
+        tool = Mock()
+        tool.description = "Base description"
+        tool.inputSchema = {
             "properties": {
                 "Drug SMILES": {"type": "string", "description": "SMILES string"},
                 "Dose": {"type": "number", "description": "Drug dose"},
@@ -410,18 +571,8 @@ class TestToolDescriptionEnhancement:
             "required": ["Drug SMILES"],
         }
 
-        # Enhancement logic from server
-        enhanced_description = tool_description
-        if tool_schema.get("properties"):
-            enhanced_description += "\n\nParameters:"
-            for param_name, param_info in tool_schema["properties"].items():
-                param_desc = param_info.get("description", "")
-                param_type = param_info.get("type", "string")
-                is_required = param_name in tool_schema.get("required", [])
-                required_marker = " (required)" if is_required else " (optional)"
-                enhanced_description += (
-                    f"\n- {param_name}{required_marker}: {param_desc} (type: {param_type})"
-                )
+        # Enhancement used by server at registration time
+        enhanced_description = build_tool_description(tool)
 
         # Verify enhancement
         assert "Parameters:" in enhanced_description
@@ -8,6 +8,7 @@ from unittest.mock import Mock, patch
 
 from txgemma.tool_factory import (
     analyze_tools,
+    build_tool_description,
     build_tool_from_template,
     build_tools,
     get_placeholder_description,
@@ -15,6 +16,7 @@ from txgemma.tool_factory import (
     get_placeholder_type,
     get_tool_names,
     suggest_tool_subsets,
+    tool_manifest_digest,
 )
 
 
@@ -157,6 +159,75 @@ class TestBuildToolFromTemplate:
         desc = tool.inputSchema["properties"]["Drug SMILES"]["description"]
         assert "42 tools" in desc
 
+    def test_build_tools_do_not_share_property_schemas(self):
+        """Test that tools using the same placeholder get independent schemas."""
+        template1 = Mock()
+        template1.name = "tool1"
+        template1.placeholders = ["Drug SMILES"]
+        template1.get_description.return_value = "Tool 1"
+
+        template2 = Mock()
+        template2.name = "tool2"
+        template2.placeholders = ["Drug SMILES"]
+        template2.get_description.return_value = "Tool 2"
+
+        prop1 = build_tool_from_template(template1).inputSchema["properties"]["Drug SMILES"]
+        prop2 = build_tool_from_template(template2).inputSchema["properties"]["Drug SMILES"]
+
+        assert prop1 == prop2
+        assert prop1 is not prop2
+
+    def test_build_tools_intern_placeholder_names(self):
+        """Test that equal placeholder names from different templates share one string."""
+        template1 = Mock()
+        template1.name = "tool1"
+        template1.placeholders = ["".join(["Drug ", "SMILES"])]
+        template1.get_description.return_value = "Tool 1"
+
+        template2 = Mock()
+        template2.name = "tool2"
+        template2.placeholders = ["".join(["Drug ", "SMILES"])]
+        template2.get_description.return_value = "Tool 2"
+
+        assert template1.placeholders[0] is not template2.placeholders[0]
+
+        required1 = build_tool_from_template(template1).inputSchema["required"]
+        required2 = build_tool_from_template(template2).inputSchema["required"]
+
+        assert required1[0] is required2[0]
+
+
+class TestBuildToolDescription:
+    """Test agent-facing tool descriptions."""
+
+    def test_description_lists_parameters(self):
+        """Test that each parameter gets one line with required marker and type."""
+        tool = Mock()
+        tool.description = "Base description"
+        tool.inputSchema = {
+            "properties": {
+                "Drug SMILES": {"type": "string", "description": "SMILES string"},
+                "Dose": {"type": "number", "description": "Drug dose"},
+            },
+            "required": ["Drug SMILES"],
+        }
+
+        description = build_tool_description(tool)
+
+        assert description == (
+            "Base description\n\nParameters:"
+            "\n- Drug SMILES (required): SMILES string (type: string)"
+            "\n- Dose (optional): Drug dose (type: number)"
+        )
+
+    def test_description_without_parameters(self):
+        """Test that tools without parameters keep their plain description."""
+        tool = Mock()
+        tool.description = "No inputs"
+        tool.inputSchema = {"type": "object", "properties": {}, "required": []}
+
+        assert build_tool_description(tool) == "No inputs"
+
 
 class TestBuildTools:
     """Test build_tools function with various filters."""
@@ -180,7 +251,7 @@ class TestBuildTools:
         template2.placeholder_count.return_value = 1
         template2.get_description.return_value = "Tool 2"
 
-        mock_loader.all.return_value = {"tool1": template1, "tool2": template2}
+        mock_loader.all.return_value = {"tool2": template2, "tool1": template1}
         mock_loader.placeholder_stats.return_value = {}
 
         mock_get_loader.return_value = mock_loader
@@ -189,6 +260,9 @@ class TestBuildTools:
         tools = build_tools()
 
         assert len(tools) == 2
+        # Returned as a tuple sorted by name, regardless of loader order
+        assert isinstance(tools, tuple)
+        assert [t.name for t in tools] == ["tool1", "tool2"]
         # loader.all() is called multiple times (for filtering and logging)
         assert mock_loader.all.called
 
@@ -272,6 +346,35 @@ class TestBuildTools:
         assert len(tools) == 1
         assert tools[0].name == "simple"
 
+    @patch("txgemma.tool_factory.get_loader")
+    def test_build_tools_min_placeholders(self, mock_get_loader):
+        """Test filtering by minimum placeholder count."""
+        mock_loader = Mock()
+
+        simple = Mock()
+        simple.name = "simple"
+        simple.placeholders = ["Drug SMILES"]
+        simple.placeholder_count.return_value = 1
+        simple.get_description.return_value = "Simple"
+
+        complex_tool = Mock()
+        complex_tool.name = "complex"
+        complex_tool.placeholders = ["A", "B", "C"]
+        complex_tool.placeholder_count.return_value = 3
+        complex_tool.get_description.return_value = "Complex"
+
+        mock_loader.all.return_value = {"simple": simple, "complex": complex_tool}
+        mock_loader.placeholder_stats.return_value = {}
+
+        mock_get_loader.return_value = mock_loader
+
+        tools = build_tools(min_placeholders=3)
+
+        # Should only get complex tool; simple template is never turned into a Tool
+        assert len(tools) == 1
+        assert tools[0].name == "complex"
+        simple.get_description.assert_not_called()
+
     @patch("txgemma.tool_factory.get_loader")
     def test_build_tools_fuzzy_match(self, mock_get_loader):
         """Test fuzzy placeholder matching."""
@@ -325,9 +428,39 @@ class TestGetToolNames:
         assert "smiles_tool" in names
 
 
+class TestToolManifestDigest:
+    """Test tool catalog fingerprinting."""
+
+    @staticmethod
+    def _make_tool(name, placeholders):
+        template = Mock()
+        template.name = name
+        template.placeholders = placeholders
+        template.get_description.return_value = f"Description of {name}"
+        return build_tool_from_template(template)
+
+    def test_digest_ignores_tool_order(self):
+        """Test that the digest is stable regardless of tool order."""
+        tool_a = self._make_tool("tool_a", ["Drug SMILES"])
+        tool_b = self._make_tool("tool_b", ["Target sequence"])
+
+        assert tool_manifest_digest([tool_a, tool_b]) == tool_manifest_digest([tool_b, tool_a])
+
+    def test_digest_changes_with_schema(self):
+        """Test that a schema change produces a different digest."""
+        tool = self._make_tool("tool_a", ["Drug SMILES"])
+        changed = self._make_tool("tool_a", ["Drug SMILES", "Target sequence"])
+
+        assert tool_manifest_digest([tool]) != tool_manifest_digest([changed])
+
+
 class TestAnalyzeTools:
     """Test tool analysis function."""
 
+    def setup_method(self):
+        """Reset memoized analysis before each test."""
+        analyze_tools.cache_clear()
+
     @patch("txgemma.tool_factory.get_loader")
     def test_analyze_tools(self, mock_get_loader):
         """Test tool analysis returns correct statistics."""
@@ -361,13 +494,51 @@ class TestAnalyzeTools:
         assert stats["total_placeholders"] == 2
         assert stats["simple_tools"] == 3  # All have ≤2 placeholders
         assert stats["complex_tools"] == 0
-        assert 1 in stats["tools_by_complexity"]
-        assert 2 in stats["tools_by_complexity"]
+        assert stats["tools_by_complexity"] == {1: 2, 2: 1}
+        assert stats["most_common_placeholders"] == (("Drug SMILES", 3), ("Target sequence", 1))
+
+    @patch("txgemma.tool_factory.get_loader")
+    def test_analyze_tools_memoized(self, mock_get_loader):
+        """Test that repeated analysis reuses the first result."""
+        mock_loader = Mock()
+        mock_loader.all.return_value = {}
+        mock_loader.placeholder_stats.return_value = {}
+        mock_loader.most_common_placeholders.return_value = []
+        mock_get_loader.return_value = mock_loader
+
+        stats1 = analyze_tools()
+        stats2 = analyze_tools()
+
+        assert stats1 == stats2
+        mock_get_loader.assert_called_once()
+
+    @patch("txgemma.tool_factory.get_loader")
+    def test_analyze_tools_returns_copies(self, mock_get_loader):
+        """Test that mutating a result does not corrupt the memoized analysis."""
+        mock_loader = Mock()
+        mock_loader.all.return_value = {}
+        mock_loader.placeholder_stats.return_value = {"Drug SMILES": 3}
+        mock_loader.most_common_placeholders.return_value = [("Drug SMILES", 3)]
+        mock_get_loader.return_value = mock_loader
+
+        stats = analyze_tools()
+        stats["total_tools"] = 99
+        stats["placeholder_usage"]["Drug SMILES"] = 0
+        stats["tools_by_complexity"][5] = 1
+
+        fresh = analyze_tools()
+        assert fresh["total_tools"] == 0
+        assert fresh["placeholder_usage"] == {"Drug SMILES": 3}
+        assert fresh["tools_by_complexity"] == {}
 
 
 class TestSuggestToolSubsets:
     """Test tool subset suggestions."""
 
+    def setup_method(self):
+        """Reset memoized subsets before each test."""
+        suggest_tool_subsets.cache_clear()
+
     @patch("txgemma.tool_factory.get_tool_names")
     def test_suggest_tool_subsets(self, mock_get_tool_names):
         """Test that subset suggestions call correct filters."""
@@ -389,6 +560,20 @@ class TestSuggestToolSubsets:
         # Verify correct calls were made
         assert mock_get_tool_names.call_count == 4
 
+    @patch("txgemma.tool_factory.get_tool_names")
+    def test_suggest_tool_subsets_returns_copies(self, mock_get_tool_names):
+        """Test that mutating a subset list does not corrupt the memoized subsets."""
+        mock_get_tool_names.side_effect = [["tool2", "tool1"], ["tool3"], ["tool1"], ["tool4"]]
+
+        subsets = suggest_tool_subsets()
+        subsets["drug_discovery"].sort()
+        subsets["protein_analysis"].append("extra")
+
+        fresh = suggest_tool_subsets()
+        assert fresh["drug_discovery"] == ["tool2", "tool1"]
+        assert fresh["protein_analysis"] == ["tool3"]
+        assert mock_get_tool_names.call_count == 4
+
 
 class TestPlaceholderPatternValidation:
     """Test that patterns actually validate correctly."""
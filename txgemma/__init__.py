@@ -2,37 +2,49 @@
 TxGemma MCP package.
 
 Provides Model Context Protocol tools for TxGemma therapeutic AI models.
+
+Public names are imported lazily on first access, so importing a light
+submodule (e.g. ``txgemma.prompts``) does not pull in torch/transformers.
 """
 
-from txgemma.chat_factory import register_chat_tool
-from txgemma.executor import execute_chat, execute_chat_async, execute_tool, execute_tool_async
-from txgemma.model import (
-    TxGemmaChatModel,
-    TxGemmaPredictModel,
-    get_chat_model,
-    get_predict_model,
-)
-from txgemma.prompts import PromptLoader, PromptTemplate, get_loader
-from txgemma.tool_factory import build_tools
+import importlib
 
 __version__ = "0.1.0"
 
-__all__ = [
+# Public name -> defining module
+_EXPORTS = {
     # Models
-    "TxGemmaPredictModel",
-    "TxGemmaChatModel",
-    "get_predict_model",
-    "get_chat_model",
+    "TxGemmaPredictModel": "txgemma.model",
+    "TxGemmaChatModel": "txgemma.model",
+    "get_predict_model": "txgemma.model",
+    "get_chat_model": "txgemma.model",
     # Execution
-    "execute_tool",
-    "execute_tool_async",
-    "execute_chat",
-    "execute_chat_async",
+    "execute_tool": "txgemma.executor",
+    "execute_tool_async": "txgemma.executor",
+    "execute_chat": "txgemma.executor",
+    "execute_chat_async": "txgemma.executor",
     # Tool building
-    "build_tools",
-    "register_chat_tool",
+    "build_tools": "txgemma.tool_factory",
+    "register_chat_tool": "txgemma.chat_factory",
     # Prompts
-    "PromptTemplate",
-    "PromptLoader",
-    "get_loader",
-]
+    "PromptTemplate": "txgemma.prompts",
+    "PromptLoader": "txgemma.prompts",
+    "get_loader": "txgemma.prompts",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Resolve public names on first access and cache them on the package."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
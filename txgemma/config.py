@@ -6,10 +6,12 @@ Loads settings from config.yaml with environment variable overrides.
 
 import logging
 import os
+import threading
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Literal
 
-import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 logger = logging.getLogger(__name__)
 
@@ -17,41 +19,112 @@ logger = logging.getLogger(__name__)
 class PredictConfig(BaseModel):
     """Prediction model configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     model: str = Field(default="google/txgemma-2b-predict")
     max_new_tokens: int = Field(default=64)
+    quantization: Literal["int8", "nf4"] | None = Field(default=None)
 
 
 class ChatConfig(BaseModel):
     """Chat model configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     model: str = Field(default="google/txgemma-9b-chat")
     max_new_tokens: int = Field(default=100)
+    quantization: Literal["int8", "nf4"] | None = Field(default=None)
 
 
 class PromptsConfig(BaseModel):
     """Prompts source configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     filename: str = Field(default="tdc_prompts.json")
     local_override: str | None = Field(default=None)
+    prefer_cache: bool = Field(default=False)
 
 
 class ToolsConfig(BaseModel):
     """Tool loading configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     prompts: PromptsConfig = Field(default_factory=PromptsConfig)
     filter_placeholder: str | None = Field(default="Drug SMILES")
     max_placeholders: int | None = Field(default=None)
     enable_chat: bool = Field(default=True)
+    lazy_registration: bool = Field(default=False)
 
 
 class Config(BaseModel):
     """Main configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     predict: PredictConfig = Field(default_factory=PredictConfig)
     chat: ChatConfig = Field(default_factory=ChatConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
 
 
+def _read_yaml(f) -> Any:
+    """
+    Parse a YAML stream with the libyaml loader when available.
+
+    PyYAML is imported here rather than at module level: defaults-only and
+    environment-only configurations never need it.
+    """
+    import yaml
+
+    try:
+        # libyaml-backed loader: same output as SafeLoader, parsed in C
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+
+    return yaml.load(f, Loader=SafeLoader)
+
+
+# Values (compared lowercased) that clear an optional string setting
+_NULL_LITERALS = frozenset({"null", "none", ""})
+_NULL_MAX_LEN = max(map(len, _NULL_LITERALS))
+
+
+def _nullable_str(value: str) -> str | None:
+    """Return None for null/none/empty (any case), otherwise the value unchanged."""
+    # lower() never shortens a string, so longer values can't be null literals
+    if len(value) <= _NULL_MAX_LEN and value.lower() in _NULL_LITERALS:
+        return None
+    return value
+
+
+# (environment variable, (section, key), coercer) overrides, applied on top of the config file
+_OVERRIDES = (
+    ("TXGEMMA_PREDICT_MODEL", ("predict", "model"), str),
+    ("TXGEMMA_PREDICT_MAX_TOKENS", ("predict", "max_new_tokens"), int),
+    ("TXGEMMA_CHAT_MODEL", ("chat", "model"), str),
+    ("TXGEMMA_CHAT_MAX_TOKENS", ("chat", "max_new_tokens"), int),
+    ("TXGEMMA_FILTER_PLACEHOLDER", ("tools", "filter_placeholder"), _nullable_str),
+)
+
+
+@lru_cache(maxsize=8)
+def _env_overlay(values: tuple[str | None, ...]) -> tuple[tuple[str, str, str, Any], ...]:
+    """
+    Coerce set override variables into (env_var, section, key, value) tuples.
+
+    ``values`` holds one environment value (or None when unset) per _OVERRIDES
+    entry. Memoized on that snapshot, so reloading with an unchanged environment
+    reuses the parsed overlay.
+    """
+    return tuple(
+        (env_var, section, key, coerce(value))
+        for (env_var, (section, key), coerce), value in zip(_OVERRIDES, values, strict=True)
+        if value is not None
+    )
+
+
 def load_config(config_path: Path | None = None) -> Config:
     """
     Load configuration from YAML file with environment variable overrides.
@@ -69,6 +142,7 @@ def load_config(config_path: Path | None = None) -> Config:
 
     Environment variable overrides:
         TXGEMMA_PREDICT_MODEL: Override predict.model
+        TXGEMMA_PREDICT_MAX_TOKENS: Override predict.max_new_tokens
         TXGEMMA_CHAT_MODEL: Override chat.model
         TXGEMMA_CHAT_MAX_TOKENS: Override chat.max_new_tokens
         TXGEMMA_FILTER_PLACEHOLDER: Override tools.filter_placeholder
@@ -82,40 +156,25 @@ def load_config(config_path: Path | None = None) -> Config:
     if config_path.exists():
         logger.info(f"Loading configuration from {config_path}")
         with open(config_path) as f:
-            config_dict = yaml.safe_load(f) or {}
+            config_dict = _read_yaml(f) or {}
     else:
         logger.info(f"Config file {config_path} not found, using defaults")
 
     # Apply environment variable overrides
-    env_overrides = {
-        "TXGEMMA_PREDICT_MODEL": ("predict", "model"),
-        "TXGEMMA_CHAT_MODEL": ("chat", "model"),
-        "TXGEMMA_CHAT_MAX_TOKENS": ("chat", "max_new_tokens"),
-        "TXGEMMA_FILTER_PLACEHOLDER": ("tools", "filter_placeholder"),
-    }
-
-    for env_var, (section, key) in env_overrides.items():
-        if env_var in os.environ:
-            value = os.environ[env_var]
-
-            # Convert to int if needed
-            if key in ["max_new_tokens", "max_placeholders"]:
-                value = int(value)
-
-            # Handle null/none for filter_placeholder
-            if key == "filter_placeholder" and value.lower() in ["null", "none", ""]:
-                value = None
-
-            # Ensure section exists
-            if section not in config_dict:
-                config_dict[section] = {}
-
-            config_dict[section][key] = value
-            logger.info(f"Override from {env_var}: {section}.{key} = {value}")
-
-    # Create and validate config
+    values = tuple(os.environ.get(env_var) for env_var, _, _ in _OVERRIDES)
+    for env_var, section, key, value in _env_overlay(values):
+        # Merge into the file's section in place; pydantic fills the remaining defaults.
+        # A section left empty in YAML (e.g. "predict:") parses as None.
+        if config_dict.get(section) is None:
+            config_dict[section] = {}
+
+        config_dict[section][key] = value
+        logger.info(f"Override from {env_var}: {section}.{key} = {value}")
+
+    # Create and validate config; with no file values or overrides every field is
+    # a declared default, so construct without re-validating them
     try:
-        config = Config(**config_dict)
+        config = Config(**config_dict) if config_dict else Config.model_construct()
         logger.info("Configuration loaded successfully")
         logger.info(f"  Predict model: {config.predict.model}")
         logger.info(f"  Chat model: {config.chat.model}")
@@ -128,12 +187,31 @@ def load_config(config_path: Path | None = None) -> Config:
         raise
 
 
+_config: Config | None = None
+_config_lock = threading.Lock()
+
+
 def get_config() -> Config:
     """
     Get configuration singleton.
 
-    Loads on first call, returns cached instance thereafter.
+    Loads on first call, returns cached instance thereafter. Thread-safe: concurrent
+    first calls load the configuration exactly once. Call ``get_config.cache_clear()``
+    to force a reload.
     """
-    if not hasattr(get_config, "_config"):
-        get_config._config = load_config()
-    return get_config._config
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = load_config()
+    return _config
+
+
+def _clear_config() -> None:
+    """Drop the cached configuration so the next get_config() reloads it."""
+    global _config
+    with _config_lock:
+        _config = None
+
+
+get_config.cache_clear = _clear_config
@@ -5,35 +5,32 @@ Executes tool calls by formatting prompts and running them through the model.
 Supports both prediction tools (TDC) and chat queries.
 """
 
+import asyncio
 import logging
+from collections import defaultdict
 from typing import Any
 
-from txgemma.model import get_chat_model, get_predict_model
-from txgemma.prompts import get_loader
+from txgemma.model import TxGemmaPredictModel, get_chat_model, get_predict_model
+from txgemma.prompts import PromptLoader, get_loader
 
 logger = logging.getLogger(__name__)
 
 
-def execute_tool(tool_name: str, arguments: dict[str, Any]) -> str:
+def _format_prompt(
+    tool_name: str, arguments: dict[str, Any], loader: PromptLoader | None = None
+) -> str:
     """
-    Execute a TxGemma tool with the given arguments.
-
-    Args:
-        tool_name: Name of the tool to execute
-        arguments: Dictionary of parameter name -> value mappings
-
-    Returns:
-        Prediction result from the model (stripped of whitespace)
+    Look up a tool's template and format it with the given arguments.
 
     Raises:
         KeyError: If tool_name is not found
         ValueError: If arguments are invalid for the tool
-        RuntimeError: If model generation fails
     """
-    logger.info(f"Executing tool: {tool_name}")
+    logger.info("Executing tool: %s", tool_name)
 
     # Get the prompt template
-    loader = get_loader()
+    if loader is None:
+        loader = get_loader()
     try:
         template = loader.get(tool_name)
     except KeyError:
@@ -45,18 +42,46 @@ def execute_tool(tool_name: str, arguments: dict[str, Any]) -> str:
     except ValueError as e:
         raise ValueError(f"Invalid arguments for tool '{tool_name}': {e}") from e
 
-    logger.info(f"Executing tool: {tool_name}")
-    logger.debug(f"Formatted prompt: {prompt[:100]}...")
+    logger.debug("Formatted prompt: %.100s...", prompt)
+    return prompt
+
+
+def execute_tool(
+    tool_name: str,
+    arguments: dict[str, Any],
+    *,
+    loader: PromptLoader | None = None,
+    model: TxGemmaPredictModel | None = None,
+) -> str:
+    """
+    Execute a TxGemma tool with the given arguments.
+
+    Args:
+        tool_name: Name of the tool to execute
+        arguments: Dictionary of parameter name -> value mappings
+        loader: Prompt loader to look the tool up in (default: shared loader)
+        model: Predict model to run (default: shared predict model)
+
+    Returns:
+        Prediction result from the model (stripped of whitespace)
+
+    Raises:
+        KeyError: If tool_name is not found
+        ValueError: If arguments are invalid for the tool
+        RuntimeError: If model generation fails
+    """
+    prompt = _format_prompt(tool_name, arguments, loader)
 
     # Generate prediction using model
-    model = get_predict_model()
+    if model is None:
+        model = get_predict_model()
     try:
         result = model.generate(prompt, max_new_tokens=64)
     except Exception as e:
-        logger.error(f"Model generation failed for {tool_name}: {e}")
+        logger.error("Model generation failed for %s: %s", tool_name, e)
         raise RuntimeError(f"Model generation failed: {e}") from e
 
-    logger.info(f"Tool {tool_name} completed successfully")
+    logger.info("Tool %s completed successfully", tool_name)
 
     # Strip whitespace from result
     return result.strip()
@@ -75,18 +100,18 @@ def execute_chat(question: str) -> str:
     Raises:
         RuntimeError: If chat model generation fails
     """
-    logger.info(f"Executing chat query: {question[:100]}...")
+    logger.info("Executing chat query: %.100s...", question)
 
     try:
         chat_model = get_chat_model()
-        logger.info(f"Chat model loaded, is_loaded: {chat_model.is_loaded}")
+        logger.info("Chat model loaded, is_loaded: %s", chat_model.is_loaded)
 
         response = chat_model.generate(question)
 
-        logger.info(f"Chat response generated (length: {len(response)})")
+        logger.info("Chat response generated (length: %d)", len(response))
         return response
     except Exception as e:
-        logger.error(f"Chat execution failed: {e}", exc_info=True)  # Added exc_info for traceback
+        logger.error("Chat execution failed: %s", e, exc_info=True)  # Added exc_info for traceback
         raise RuntimeError(f"Chat model error: {e}") from e
 
 
@@ -94,8 +119,8 @@ async def execute_tool_async(tool_name: str, arguments: dict[str, Any]) -> str:
     """
     Async version of execute_tool.
 
-    Currently just wraps the sync version.
-    Could be enhanced with actual async model inference in the future.
+    Concurrent calls are coalesced by the shared PredictionBatcher, so several
+    in-flight tool calls share one forward pass of the predict model.
 
     Args:
         tool_name: Name of the tool to execute
@@ -104,17 +129,25 @@ async def execute_tool_async(tool_name: str, arguments: dict[str, Any]) -> str:
     Returns:
         Prediction result from the model
     """
-    # For now, just call the sync version
-    # In future, could use async model inference
-    return execute_tool(tool_name, arguments)
+    prompt = _format_prompt(tool_name, arguments)
+
+    try:
+        result = await _prediction_batcher.submit(prompt, max_new_tokens=64)
+    except Exception as e:
+        logger.error("Model generation failed for %s: %s", tool_name, e)
+        raise RuntimeError(f"Model generation failed: {e}") from e
+
+    logger.info("Tool %s completed successfully", tool_name)
+
+    return result.strip()
 
 
 async def execute_chat_async(question: str) -> str:
     """
     Async version of execute_chat.
 
-    Currently just wraps the sync version.
-    Could be enhanced with actual async model inference in the future.
+    Runs the sync version in a worker thread, so a long chat generation does not
+    block the event loop (torch releases the GIL while the model runs).
 
     Args:
         question: User's question
@@ -122,5 +155,117 @@ async def execute_chat_async(question: str) -> str:
     Returns:
         Conversational response from chat model
     """
-    # For now, just call the sync version
-    return execute_chat(question)
+    return await asyncio.to_thread(execute_chat, question)
+
+
+class PredictionBatcher:
+    """
+    Micro-batcher for predict-model requests.
+
+    Requests are queued with a future; a background task wakes on the first
+    request, waits up to ``max_wait`` seconds for more, then runs the whole
+    batch through the model in one call and resolves each future.
+    """
+
+    def __init__(self, max_batch_size: int = 8, max_wait: float = 0.005):
+        """
+        Initialize the batcher.
+
+        Args:
+            max_batch_size: Maximum number of prompts per forward pass
+            max_wait: Seconds to wait for more requests after the first arrives
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def submit(self, prompt: str, max_new_tokens: int = 64) -> str:
+        """
+        Queue a prompt and wait for its prediction.
+
+        Args:
+            prompt: Formatted prompt
+            max_new_tokens: Maximum tokens to generate
+
+        Returns:
+            Raw model output for this prompt
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues are bound to their event loop; start over on the current one
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            # Keep the existing queue so requests already waiting on it are served
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((prompt, max_new_tokens, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect queued requests into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except TimeoutError:
+                    break
+            try:
+                await self._dispatch(batch)
+            except Exception as e:
+                # Never leave a caller waiting on a future the worker has dropped
+                logger.error("Prediction batch failed: %s", e)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _dispatch(self, batch: list) -> None:
+        """Run one model call per distinct max_new_tokens and resolve futures."""
+        groups = defaultdict(list)
+        for prompt, max_new_tokens, future in batch:
+            if not future.done():
+                groups[max_new_tokens].append((prompt, future))
+
+        model = get_predict_model()
+        for max_new_tokens, items in groups.items():
+            prompts = [prompt for prompt, _ in items]
+            logger.debug("Running batch of %d prompt(s)", len(prompts))
+            try:
+                if len(prompts) == 1:
+                    results = [
+                        await asyncio.to_thread(
+                            model.generate, prompts[0], max_new_tokens=max_new_tokens
+                        )
+                    ]
+                else:
+                    results = await asyncio.to_thread(
+                        model.generate_batch, prompts, max_new_tokens=max_new_tokens
+                    )
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"Model returned {len(results)} result(s) for {len(items)} prompt(s)"
+                    )
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(items, results, strict=True):
+                if not future.done():
+                    future.set_result(result)
+
+
+# Shared batcher used by execute_tool_async
+_prediction_batcher = PredictionBatcher()
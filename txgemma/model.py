@@ -6,17 +6,63 @@ Each model type has its own singleton class since they serve different purposes:
 - TxGemmaChatModel: Conversational explanations and Q&A
 """
 
-import logging
-from typing import Optional
+from __future__ import annotations
 
-import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+import logging
+import os
+from typing import TYPE_CHECKING
 
 from txgemma.config import get_config
 
+if TYPE_CHECKING:
+    # torch and transformers take seconds to import; they are imported in load()
+    # and the generation paths so importing this module (and the server) stays cheap
+    from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+
 logger = logging.getLogger(__name__)
 
 
+def _quantization_config(quantization: str | None) -> BitsAndBytesConfig | None:
+    """
+    Build the bitsandbytes config for a quantization mode.
+
+    Args:
+        quantization: None (full fp16 weights), "int8", or "nf4" (4-bit NormalFloat)
+
+    Returns:
+        Config to pass to from_pretrained, or None for unquantized weights
+    """
+    if quantization is None:
+        return None
+
+    import torch
+    from transformers import BitsAndBytesConfig
+
+    if quantization == "int8":
+        return BitsAndBytesConfig(load_in_8bit=True)
+    if quantization == "nf4":
+        return BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_compute_dtype=torch.float16,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_use_double_quant=True,
+        )
+    raise ValueError(f"Unknown quantization {quantization!r} (expected 'int8', 'nf4' or None)")
+
+
+def _compile_enabled() -> bool:
+    """Whether TXGEMMA_COMPILE=1 opts into compiling the model forward pass."""
+    return os.environ.get("TXGEMMA_COMPILE") == "1"
+
+
+def _compile_model(model) -> None:
+    """Replace the model's forward pass with a torch.compile'd version in place."""
+    import torch
+
+    logger.info("Compiling model forward pass with torch.compile")
+    model.forward = torch.compile(model.forward, mode="reduce-overhead", dynamic=True)
+
+
 class TxGemmaPredictModel:
     """
     Singleton wrapper for TxGemma prediction models.
@@ -27,7 +73,7 @@ class TxGemmaPredictModel:
     Configuration loaded from config.yaml by default.
     """
 
-    _instance: Optional["TxGemmaPredictModel"] = None
+    _instance: TxGemmaPredictModel | None = None
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -39,6 +85,7 @@ class TxGemmaPredictModel:
         self,
         model_name: str | None = None,
         max_new_tokens: int | None = None,
+        quantization: str | None = None,
     ):
         """
         Initialize prediction model configuration.
@@ -51,6 +98,8 @@ class TxGemmaPredictModel:
         Args:
             model_name: HuggingFace model ID (overrides config if provided)
             max_new_tokens: Max tokens for predictions (overrides config if provided)
+            quantization: "int8" or "nf4" to load bitsandbytes-quantized weights
+                (overrides config if provided)
         """
         if self._initialized:
             return
@@ -60,10 +109,12 @@ class TxGemmaPredictModel:
             config = get_config()
             config_model = config.predict.model
             config_max_tokens = config.predict.max_new_tokens
+            config_quantization = config.predict.quantization
         except Exception as e:
             logger.warning(f"Could not load config, using defaults: {e}")
             config_model = None
             config_max_tokens = None
+            config_quantization = None
 
         # Priority: argument → config → hardcoded default
         self.model_name = (
@@ -77,6 +128,8 @@ class TxGemmaPredictModel:
             else (config_max_tokens if config_max_tokens is not None else 64)
         )
 
+        self.quantization = quantization if quantization is not None else config_quantization
+
         self.tokenizer: AutoTokenizer | None = None
         self.model: AutoModelForCausalLM | None = None
         self._initialized = True
@@ -98,18 +151,27 @@ class TxGemmaPredictModel:
 
         logger.info(f"Loading predict model: {self.model_name}")
 
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
         try:
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
             self.model = AutoModelForCausalLM.from_pretrained(
                 self.model_name,
                 device_map="auto",
                 dtype=torch.float16,
+                quantization_config=_quantization_config(self.quantization),
             )
             logger.info("Predict model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load predict model: {e}")
             raise RuntimeError(f"Could not load TxGemma predict model: {e}") from e
 
+        if _compile_enabled():
+            _compile_model(self.model)
+            # Pay the compile cost here rather than on the first request
+            self.generate("Question: Warm up.\nAnswer:", max_new_tokens=1)
+
     def generate(self, prompt: str, max_new_tokens: int | None = None) -> str:
         """
         Generate a prediction.
@@ -129,17 +191,62 @@ class TxGemmaPredictModel:
         inputs = self.tokenizer(prompt, return_tensors="pt")
         inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
 
-        outputs = self.model.generate(
-            **inputs,
-            max_new_tokens=max_tokens,
-            do_sample=False,
-        )
+        import torch
+
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_tokens,
+                do_sample=False,
+            )
 
         generated_ids = outputs[0][len(inputs["input_ids"][0]) :]
         result = self.tokenizer.decode(generated_ids, skip_special_tokens=True)
 
         return result.strip()
 
+    def generate_batch(self, prompts: list[str], max_new_tokens: int | None = None) -> list[str]:
+        """
+        Generate predictions for several prompts in a single forward pass.
+
+        Prompts are left-padded so every continuation starts at the same offset.
+
+        Args:
+            prompts: TDC-formatted prompts
+            max_new_tokens: Override default max tokens
+
+        Returns:
+            One prediction per prompt, in input order
+        """
+        if not self.is_loaded:
+            self.load()
+
+        max_tokens = max_new_tokens or self.max_new_tokens
+
+        # The tokenizer is shared with generate(); only left-pad for this call
+        padding_side = self.tokenizer.padding_side
+        self.tokenizer.padding_side = "left"
+        try:
+            inputs = self.tokenizer(prompts, return_tensors="pt", padding=True)
+        finally:
+            self.tokenizer.padding_side = padding_side
+        inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
+
+        import torch
+
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_tokens,
+                do_sample=False,
+            )
+
+        prompt_length = inputs["input_ids"].shape[1]
+        return [
+            self.tokenizer.decode(ids[prompt_length:], skip_special_tokens=True).strip()
+            for ids in outputs
+        ]
+
     def unload(self) -> None:
         """Unload model to free memory."""
         if self.model is not None:
@@ -147,6 +254,9 @@ class TxGemmaPredictModel:
             del self.tokenizer
             self.model = None
             self.tokenizer = None
+
+            import torch
+
             torch.cuda.empty_cache()
             logger.info("Predict model unloaded")
 
@@ -161,7 +271,7 @@ class TxGemmaChatModel:
     Configuration loaded from config.yaml by default.
     """
 
-    _instance: Optional["TxGemmaChatModel"] = None
+    _instance: TxGemmaChatModel | None = None
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -173,6 +283,7 @@ class TxGemmaChatModel:
         self,
         model_name: str | None = None,
         max_new_tokens: int | None = None,
+        quantization: str | None = None,
     ):
         """
         Initialize chat model configuration.
@@ -185,6 +296,8 @@ class TxGemmaChatModel:
         Args:
             model_name: HuggingFace model ID (overrides config if provided)
             max_new_tokens: Max tokens for chat responses (overrides config if provided)
+            quantization: "int8" or "nf4" to load bitsandbytes-quantized weights
+                (overrides config if provided)
         """
         if self._initialized:
             return
@@ -194,10 +307,12 @@ class TxGemmaChatModel:
             config = get_config()
             config_model = config.chat.model
             config_max_tokens = config.chat.max_new_tokens
+            config_quantization = config.chat.quantization
         except Exception as e:
             logger.warning(f"Could not load config, using defaults: {e}")
             config_model = None
             config_max_tokens = None
+            config_quantization = None
 
         # Priority: argument → config → hardcoded default
         self.model_name = (
@@ -211,6 +326,8 @@ class TxGemmaChatModel:
             else (config_max_tokens if config_max_tokens is not None else 200)
         )
 
+        self.quantization = quantization if quantization is not None else config_quantization
+
         self.tokenizer: AutoTokenizer | None = None
         self.model: AutoModelForCausalLM | None = None
         self._initialized = True
@@ -232,18 +349,27 @@ class TxGemmaChatModel:
 
         logger.info(f"Loading chat model: {self.model_name}")
 
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
         try:
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
             self.model = AutoModelForCausalLM.from_pretrained(
                 self.model_name,
                 device_map="auto",
                 dtype=torch.float16,
+                quantization_config=_quantization_config(self.quantization),
             )
             logger.info("Chat model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load chat model: {e}")
             raise RuntimeError(f"Could not load TxGemma chat model: {e}") from e
 
+        if _compile_enabled():
+            _compile_model(self.model)
+            # Pay the compile cost here rather than on the first request
+            self.generate("Warm up.", max_new_tokens=1)
+
     def generate(self, prompt: str, max_new_tokens: int | None = None) -> str:
         """
         Generate a conversational response.
@@ -279,8 +405,11 @@ class TxGemmaChatModel:
             # It's already a tensor
             inputs = result.to(self.model.device)
 
+        import torch
+
         # Generate response
-        outputs = self.model.generate(input_ids=inputs, max_new_tokens=max_tokens)
+        with torch.inference_mode():
+            outputs = self.model.generate(input_ids=inputs, max_new_tokens=max_tokens)
 
         # Decode response only
         response = self.tokenizer.decode(outputs[0, len(inputs[0]) :], skip_special_tokens=True)
@@ -294,6 +423,9 @@ class TxGemmaChatModel:
             del self.tokenizer
             self.model = None
             self.tokenizer = None
+
+            import torch
+
             torch.cuda.empty_cache()
             logger.info("Chat model unloaded")
 
@@ -5,14 +5,29 @@ Load, validate, and introspect TxGemma / TDC prompt templates.
 from __future__ import annotations
 
 import builtins
+import heapq
 import json
 import logging
+import os
 import re
+import string
+import sys
+import threading
 from collections import defaultdict
+from collections.abc import Mapping
+from operator import itemgetter
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any
 
 from huggingface_hub import hf_hub_download
 
+try:
+    # Optional: orjson parses the prompts file ~2x faster; same dict either way
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 # -------------------------
@@ -27,6 +42,11 @@ DEFAULT_FILENAME = "tdc_prompts.json"
 # {Epitope amino acid sequence}
 PLACEHOLDER_REGEX = re.compile(r"\{([^{}]+)\}")
 
+# Tokenizes templates exactly as str.format does
+_FORMATTER = string.Formatter()
+
+_EMPTY_METADATA: Mapping[str, Any] = MappingProxyType({})
+
 # -------------------------
 # PromptTemplate
 # -------------------------
@@ -37,41 +57,86 @@ class PromptTemplate:
     Represents a single TxGemma / TDC prompt template.
     """
 
+    # One instance per catalog entry: slots drop the per-instance __dict__
+    __slots__ = (
+        "name",
+        "template",
+        "metadata",
+        "placeholders",
+        "_segments",
+        "_placeholder_count",
+        "_required_inputs",
+    )
+
     def __init__(
         self,
         name: str,
         template: str,
-        metadata: dict | None = None,
+        metadata: Mapping[str, Any] | None = None,
     ):
         self.name = name
         self.template = template
-        self.metadata = metadata or {}
-
-        self.placeholders: list[str] = self._extract_placeholders()
+        # Always a read-only snapshot; metadata-less templates (most of the catalog)
+        # share one empty mapping
+        self.metadata = MappingProxyType(dict(metadata)) if metadata else _EMPTY_METADATA
+
+        # Tokenized once: placeholders and render segments come from the same parse,
+        # so format() never rescans the template
+        self.placeholders: list[str]
+        self._segments: tuple[tuple[str, str | None], ...] | None
+        self.placeholders, self._segments = self._parse()
+        self._placeholder_count = len(self.placeholders)
+        self._required_inputs: frozenset[str] = frozenset(self.placeholders)
 
     # ---- Introspection ----
 
-    def _extract_placeholders(self) -> list[str]:
+    def _parse(self) -> tuple[list[str], tuple[tuple[str, str | None], ...] | None]:
         """
-        Extract placeholder variables from template.
+        Tokenize the template with str.format's own parser.
+
+        Returns the unique placeholder names (in order of first use) and the
+        (literal text, field name or None) segments format() renders from.
+        Escaped braces ("{{...}}") are literal text, not placeholders.
 
-        Preserves order and uniqueness.
+        Segments are None when rendering needs full str.format semantics (format
+        specs, conversions, attribute/index lookups, positional fields); format()
+        then falls back to str.format. Templates str.format cannot parse take their
+        placeholders from PLACEHOLDER_REGEX and report the error when formatted.
         """
-        matches = PLACEHOLDER_REGEX.findall(self.template)
-        return list(dict.fromkeys(matches))
+        try:
+            # Field names are interned: the same few placeholders recur across the
+            # catalog, so templates, index and tool schemas share one string each
+            parsed = [
+                (literal, sys.intern(field) if field else field, spec, conversion)
+                for literal, field, spec, conversion in _FORMATTER.parse(self.template)
+            ]
+        except ValueError:
+            fields = PLACEHOLDER_REGEX.findall(self.template)
+            return list(dict.fromkeys(map(sys.intern, fields))), None
+
+        placeholders = list(dict.fromkeys(field for _, field, _, _ in parsed if field))
+
+        segments = []
+        for literal, field, spec, conversion in parsed:
+            if field is not None and (
+                spec or conversion or not field or field.isdigit() or "." in field or "[" in field
+            ):
+                return placeholders, None
+            segments.append((literal, field))
+        return placeholders, tuple(segments)
 
     @property
     def required_inputs(self) -> set[str]:
-        """Set of required input variables."""
-        return set(self.placeholders)
+        """Set of required input variables (a fresh copy; safe to mutate)."""
+        return set(self._required_inputs)
 
     def has_placeholder(self, placeholder: str) -> bool:
         """Check if this template requires a specific placeholder."""
-        return placeholder in self.required_inputs
+        return placeholder in self._required_inputs
 
     def placeholder_count(self) -> int:
         """Number of unique placeholders in this template."""
-        return len(self.placeholders)
+        return self._placeholder_count
 
     # ---- Rendering ----
 
@@ -82,11 +147,21 @@ class PromptTemplate:
         Raises:
             ValueError if required placeholders are missing.
         """
-        missing = self.required_inputs - set(kwargs.keys())
-        if missing:
+        # Subset test against the keys view: no set is built unless something is missing
+        if not self._required_inputs <= kwargs.keys():
+            missing = self._required_inputs - kwargs.keys()
             raise ValueError(f"Missing required placeholders for '{self.name}': {sorted(missing)}")
 
-        return self.template.format(**kwargs)
+        if self._segments is None:
+            return self.template.format(**kwargs)
+
+        parts = []
+        for literal, field in self._segments:
+            parts.append(literal)
+            if field is not None:
+                # format() with an empty spec, exactly as str.format renders a field
+                parts.append(format(kwargs[field]))
+        return "".join(parts)
 
     # ---- Human-facing descriptions ----
 
@@ -110,12 +185,12 @@ class PromptTemplate:
         return {
             "name": self.name,
             "description": self.get_description(),
-            "required_inputs": sorted(self.required_inputs),
+            "required_inputs": sorted(self._required_inputs),
             "placeholder_count": self.placeholder_count(),
         }
 
     def __str__(self) -> str:
-        inputs = ", ".join(sorted(self.required_inputs)) or "none"
+        inputs = ", ".join(sorted(self.placeholders)) or "none"
         desc = self.get_description()
 
         # Keep description short for logs
@@ -126,7 +201,7 @@ class PromptTemplate:
             f"PromptTemplate("
             f"name='{self.name}', "
             f"inputs=[{inputs}], "
-            f"placeholders={self.placeholder_count()}, "
+            f"placeholders={self._placeholder_count}, "
             f"description='{desc}'"
             f")"
         )
@@ -158,32 +233,39 @@ class PromptLoader:
         hf_repo: str = DEFAULT_HF_REPO,
         filename: str = DEFAULT_FILENAME,
         local_override: Path | None = None,
+        prefer_cache: bool = False,
     ):
         self.hf_repo = hf_repo
         self.filename = filename
         self.local_override = local_override
+        self.prefer_cache = prefer_cache
 
         self._templates: dict[str, PromptTemplate] = {}
-        self._placeholder_index: dict[str, set[str]] = defaultdict(set)
+        self._placeholder_index: dict[str, frozenset[str]] = {}
+        # Placeholder -> lowercased form, for case-insensitive (fuzzy) matching
+        self._placeholder_lower: dict[str, str] = {}
         self._loaded = False
+        self._load_lock = threading.Lock()
         self._source = None  # Track where prompts were loaded from
+        self._source_fingerprint: tuple[str, int, int] | None = None
 
     # ---- Loading ----
 
-    def _load_json(self) -> dict:
+    def _resolve_path(self) -> Path | str:
         """
-        Load prompts JSON from local file or Hugging Face.
+        Locate the prompts file: local override, Hugging Face cache, or a download.
 
         Raises:
             FileNotFoundError: If local override doesn't exist
             RuntimeError: If HuggingFace download fails
-            ValueError: If JSON is invalid
         """
         if self.local_override:
             if not self.local_override.exists():
                 raise FileNotFoundError(f"Local override not found: {self.local_override}")
             path = self.local_override
             self._source = f"local file: {path}"
+        elif self.prefer_cache and (path := self._cached_download()):
+            self._source = f"HuggingFace cache: {self.hf_repo}/{self.filename}"
         else:
             try:
                 path = hf_hub_download(
@@ -196,11 +278,35 @@ class PromptLoader:
                     f"Failed to download prompts from HuggingFace "
                     f"({self.hf_repo}/{self.filename}): {e}"
                 ) from e
+        return path
+
+    @staticmethod
+    def _fingerprint(path: Path | str) -> tuple[str, int, int]:
+        """Identify one version of a prompts file by (path, mtime_ns, size)."""
+        stat = os.stat(path)
+        return os.fspath(path), stat.st_mtime_ns, stat.st_size
+
+    def _load_json(self, path: Path | str | None = None) -> dict:
+        """
+        Load prompts JSON from local file or Hugging Face.
+
+        Args:
+            path: Prompts file to read (default: resolved from the configured source)
+
+        Raises:
+            FileNotFoundError: If local override doesn't exist
+            RuntimeError: If HuggingFace download fails
+            ValueError: If JSON is invalid
+        """
+        if path is None:
+            path = self._resolve_path()
 
         try:
-            with open(path, encoding="utf-8") as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
+            # Taken before reading, so a write racing the read shows up on reload()
+            self._source_fingerprint = self._fingerprint(path)
+            with open(path, "rb") as f:
+                data = _json_loads(f.read())
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
             raise ValueError(f"Invalid JSON in prompts file ({path}): {e}") from e
         except Exception as e:
             raise RuntimeError(f"Failed to read prompts file ({path}): {e}") from e
@@ -208,14 +314,52 @@ class PromptLoader:
         logger.info(f"Loaded {len(data)} prompt definitions from {self._source}")
         return data
 
+    def _cached_download(self) -> str | None:
+        """
+        Return the locally cached prompts file, revalidating it in the background.
+
+        Skips the network round-trip on startup; a daemon thread refreshes the
+        cache so the next start picks up upstream changes.
+
+        Returns:
+            Path to the cached file, or None if nothing is cached yet
+        """
+        try:
+            path = hf_hub_download(
+                repo_id=self.hf_repo,
+                filename=self.filename,
+                local_files_only=True,
+            )
+        except Exception:
+            return None
+
+        threading.Thread(
+            target=self._refresh_cache, name="txgemma-prompts-refresh", daemon=True
+        ).start()
+        return path
+
+    def _refresh_cache(self):
+        """Re-download the prompts file into the Hugging Face cache."""
+        try:
+            hf_hub_download(repo_id=self.hf_repo, filename=self.filename)
+        except Exception as e:
+            logger.warning(f"Background refresh of {self.hf_repo}/{self.filename} failed: {e}")
+
     def _build_placeholder_index(self):
         """
         Build reverse index: placeholder -> set of template names that use it.
+
+        Sets are frozen so lookups can hand them out without defensive copies.
         """
-        self._placeholder_index.clear()
+        index: dict[str, set[str]] = defaultdict(set)
         for name, template in self._templates.items():
             for placeholder in template.placeholders:
-                self._placeholder_index[placeholder].add(name)
+                index[placeholder].add(name)
+
+        self._placeholder_index = {
+            placeholder: frozenset(names) for placeholder, names in index.items()
+        }
+        self._placeholder_lower = {placeholder: placeholder.lower() for placeholder in index}
 
     def load(self):
         """
@@ -228,7 +372,14 @@ class PromptLoader:
         if self._loaded:
             return
 
-        data = self._load_json()
+        # Concurrent first calls (e.g. several server threads) parse the file once
+        with self._load_lock:
+            if not self._loaded:
+                self._load_templates()
+
+    def _load_templates(self, path: Path | str | None = None):
+        """Parse the prompts JSON into templates and build the placeholder index."""
+        data = self._load_json(path)
 
         # Validate top-level structure
         if not isinstance(data, dict):
@@ -273,14 +424,21 @@ class PromptLoader:
         """
         Reload prompts from source.
 
-        Useful for development when prompts are being updated.
+        Useful for development when prompts are being updated. The file is only
+        re-parsed if its path, modification time or size changed since the last load.
         """
         logger.info("Reloading prompts...")
-        self._loaded = False
-        self._templates.clear()
-        self._placeholder_index.clear()
-        self._source = None
-        self.load()
+        with self._load_lock:
+            path = self._resolve_path()
+            if self._loaded and self._fingerprint(path) == self._source_fingerprint:
+                logger.info("Prompts file unchanged, keeping loaded templates")
+                return
+
+            self._loaded = False
+            self._templates.clear()
+            self._placeholder_index.clear()
+            self._placeholder_lower.clear()
+            self._load_templates(path)
 
     # ---- Accessors ----
 
@@ -332,10 +490,12 @@ class PromptLoader:
         self.load()
         return set(self._placeholder_index.keys())
 
-    def placeholder_usage(self, placeholder: str) -> set[str]:
+    def placeholder_usage(self, placeholder: str) -> frozenset[str]:
         """
         Get set of template names that use a specific placeholder.
 
+        Served straight from the reverse index built at load time.
+
         Args:
             placeholder: Placeholder name (e.g., "Drug SMILES")
 
@@ -344,10 +504,10 @@ class PromptLoader:
 
         Example:
             >>> loader.placeholder_usage("Drug SMILES")
-            {'predict_toxicity', 'predict_bbb_permeability', ...}
+            frozenset({'predict_toxicity', 'predict_bbb_permeability', ...})
         """
         self.load()
-        return self._placeholder_index.get(placeholder, set()).copy()
+        return self._placeholder_index.get(placeholder, frozenset())
 
     def placeholder_stats(self) -> dict[str, int]:
         """
@@ -377,7 +537,8 @@ class PromptLoader:
             List of (placeholder, usage_count) tuples, sorted by count descending
         """
         stats = self.placeholder_stats()
-        return sorted(stats.items(), key=lambda x: x[1], reverse=True)[:top_n]
+        # O(P log k) partial selection; ties keep index order like a stable sort
+        return heapq.nlargest(top_n, stats.items(), key=itemgetter(1))
 
     # ---- Filtering by Placeholder ----
 
@@ -404,18 +565,18 @@ class PromptLoader:
         self.load()
 
         if exact:
-            template_names = self._placeholder_index.get(placeholder, set())
+            template_names = self._placeholder_index.get(placeholder, frozenset())
             return {name: self._templates[name] for name in template_names}
         else:
-            # Fuzzy match - case insensitive substring search
+            # Fuzzy match - case insensitive substring search over the unique
+            # placeholders, then collect their templates from the index
             placeholder_lower = placeholder.lower()
-            result = {}
-            for name, template in self._templates.items():
-                for tmpl_placeholder in template.placeholders:
-                    if placeholder_lower in tmpl_placeholder.lower():
-                        result[name] = template
-                        break
-            return result
+            names = set()
+            for ph, ph_lower in self._placeholder_lower.items():
+                if placeholder_lower in ph_lower:
+                    names |= self._placeholder_index[ph]
+            # Keep catalog order
+            return {name: template for name, template in self._templates.items() if name in names}
 
     def filter_by_placeholders(
         self, placeholders: builtins.list[str], *, match_all: bool = True
@@ -440,20 +601,17 @@ class PromptLoader:
         """
         self.load()
 
+        # Combine the index's name sets instead of testing every template
+        name_sets = [self._placeholder_index.get(ph, frozenset()) for ph in placeholders]
         if match_all:
-            # Template must have ALL placeholders
-            result = {}
-            for name, template in self._templates.items():
-                if all(ph in template.required_inputs for ph in placeholders):
-                    result[name] = template
-            return result
+            # Template must have ALL placeholders (no placeholders: every template)
+            names = frozenset.intersection(*name_sets) if name_sets else self._templates.keys()
         else:
             # Template must have ANY placeholder
-            result = {}
-            for name, template in self._templates.items():
-                if any(ph in template.required_inputs for ph in placeholders):
-                    result[name] = template
-            return result
+            names = frozenset().union(*name_sets)
+
+        # Keep catalog order
+        return {name: template for name, template in self._templates.items() if name in names}
 
     # ---- Convenience Filters (for common use cases) ----
 
@@ -477,7 +635,7 @@ class PromptLoader:
         return {
             name: tmpl
             for name, tmpl in self._templates.items()
-            if tmpl.placeholder_count() <= max_placeholders
+            if tmpl._placeholder_count <= max_placeholders
         }
 
     def complex_prompts(self, min_placeholders: int = 3) -> dict[str, PromptTemplate]:
@@ -491,7 +649,7 @@ class PromptLoader:
         return {
             name: tmpl
             for name, tmpl in self._templates.items()
-            if tmpl.placeholder_count() >= min_placeholders
+            if tmpl._placeholder_count >= min_placeholders
         }
 
     @property
@@ -505,6 +663,7 @@ class PromptLoader:
 # -------------------------
 
 _default_loader: PromptLoader | None = None
+_default_loader_lock = threading.Lock()
 
 
 def get_loader() -> PromptLoader:
@@ -513,31 +672,43 @@ def get_loader() -> PromptLoader:
 
     Configuration loaded from config.yaml.
     HuggingFace repo automatically derived from predict.model.
+    Thread-safe: concurrent first calls create a single loader.
     """
     global _default_loader
     if _default_loader is None:
-        try:
-            # Try to load from config
-            from txgemma.config import get_config
-
-            config = get_config()
-
-            prompts_config = config.tools.prompts
-
-            # Check if using local override
-            if prompts_config.local_override:
-                local_path = Path(prompts_config.local_override)
-                _default_loader = PromptLoader(local_override=local_path)
-                logger.info(f"Prompts loaded from local file: {local_path}")
-            else:
-                # Use HuggingFace - derive repo from predict model
-                hf_repo = config.predict.model
-                _default_loader = PromptLoader(hf_repo=hf_repo, filename=prompts_config.filename)
-                logger.info(f"Prompts loaded from HuggingFace: {hf_repo}/{prompts_config.filename}")
-        except Exception as e:
-            # Fallback to defaults if config not available
-            logger.warning(f"Could not load prompts config, using defaults: {e}")
-            _default_loader = PromptLoader()
-            logger.info(f"Prompts loaded from default: {DEFAULT_HF_REPO}/{DEFAULT_FILENAME}")
+        with _default_loader_lock:
+            # Another thread may have created it while we waited for the lock
+            if _default_loader is not None:
+                return _default_loader
+
+            try:
+                # Try to load from config
+                from txgemma.config import get_config
+
+                config = get_config()
+
+                prompts_config = config.tools.prompts
+
+                # Check if using local override
+                if prompts_config.local_override:
+                    local_path = Path(prompts_config.local_override)
+                    _default_loader = PromptLoader(local_override=local_path)
+                    logger.info(f"Prompts loaded from local file: {local_path}")
+                else:
+                    # Use HuggingFace - derive repo from predict model
+                    hf_repo = config.predict.model
+                    _default_loader = PromptLoader(
+                        hf_repo=hf_repo,
+                        filename=prompts_config.filename,
+                        prefer_cache=prompts_config.prefer_cache,
+                    )
+                    logger.info(
+                        f"Prompts loaded from HuggingFace: {hf_repo}/{prompts_config.filename}"
+                    )
+            except Exception as e:
+                # Fallback to defaults if config not available
+                logger.warning(f"Could not load prompts config, using defaults: {e}")
+                _default_loader = PromptLoader()
+                logger.info(f"Prompts loaded from default: {DEFAULT_HF_REPO}/{DEFAULT_FILENAME}")
 
     return _default_loader
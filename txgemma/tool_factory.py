@@ -2,7 +2,14 @@
 Dynamically generate MCP tools from TDC prompt templates.
 """
 
+import hashlib
+import json
 import logging
+import sys
+from collections import Counter
+from collections.abc import Iterable
+from functools import cache, lru_cache
+from operator import attrgetter
 from typing import Any
 
 from mcp.types import Tool
@@ -16,6 +23,32 @@ logger = logging.getLogger(__name__)
 # Placeholder Metadata
 # -------------------------
 
+# JSON schema type inferred from keywords in the placeholder name, checked in order
+_TYPE_KEYWORDS = (
+    ("integer", ("count", "number", "quantity", "index")),  # Numeric types
+    ("number", ("dose", "concentration", "score", "value")),
+    ("boolean", ("is", "has", "can", "should")),  # Boolean types
+)
+
+# Known placeholder descriptions
+_PLACEHOLDER_DESCRIPTIONS = {
+    "Drug SMILES": "SMILES string representation of the drug molecule",
+    "Product SMILES": "SMILES string of the product/target molecule",
+    "Molecule SMILES": "SMILES string of the molecule",
+    "Target sequence": "Amino acid sequence of the target protein",
+    "Protein sequence": "Amino acid sequence of the protein",
+    "Epitope amino acid sequence": "Amino acid sequence of the epitope region",
+    "Indication": "Disease or medical condition being treated",
+    "Disease": "Name of the disease or medical condition",
+    "Trial phase": "Clinical trial phase (1, 2, or 3)",
+    "Phase": "Clinical development phase",
+    "Cell line": "Cell line identifier (e.g., HeLa, MCF-7, A549)",
+    "Dosage": "Drug dosage amount and unit",
+    "Dose": "Administered dose of the drug",
+    "Property name": "Name of the molecular property to predict",
+    "Target name": "Name or identifier of the biological target",
+}
+
 
 def get_placeholder_type(placeholder: str) -> str:
     """
@@ -29,15 +62,10 @@ def get_placeholder_type(placeholder: str) -> str:
     """
     placeholder_lower = placeholder.lower()
 
-    # Numeric types
-    if any(word in placeholder_lower for word in ["count", "number", "quantity", "index"]):
-        return "integer"
-    if any(word in placeholder_lower for word in ["dose", "concentration", "score", "value"]):
-        return "number"
-
-    # Boolean types
-    if any(word in placeholder_lower for word in ["is", "has", "can", "should"]):
-        return "boolean"
+    # First matching keyword group wins
+    for json_type, keywords in _TYPE_KEYWORDS:
+        if any(word in placeholder_lower for word in keywords):
+            return json_type
 
     # Default to string
     return "string"
@@ -56,29 +84,9 @@ def get_placeholder_description(placeholder: str, usage_count: int | None = None
     Returns:
         Description string
     """
-    # Known placeholder descriptions
-    descriptions = {
-        "Drug SMILES": "SMILES string representation of the drug molecule",
-        "Product SMILES": "SMILES string of the product/target molecule",
-        "Molecule SMILES": "SMILES string of the molecule",
-        "Target sequence": "Amino acid sequence of the target protein",
-        "Protein sequence": "Amino acid sequence of the protein",
-        "Epitope amino acid sequence": "Amino acid sequence of the epitope region",
-        "Indication": "Disease or medical condition being treated",
-        "Disease": "Name of the disease or medical condition",
-        "Trial phase": "Clinical trial phase (1, 2, or 3)",
-        "Phase": "Clinical development phase",
-        "Cell line": "Cell line identifier (e.g., HeLa, MCF-7, A549)",
-        "Dosage": "Drug dosage amount and unit",
-        "Dose": "Administered dose of the drug",
-        "Property name": "Name of the molecular property to predict",
-        "Target name": "Name or identifier of the biological target",
-    }
-
     # Try exact match first
-    if placeholder in descriptions:
-        desc = descriptions[placeholder]
-    else:
+    desc = _PLACEHOLDER_DESCRIPTIONS.get(placeholder)
+    if desc is None:
         # Fallback: generate from placeholder name
         desc = placeholder.replace("_", " ").replace("{", "").replace("}", "")
         desc = f"Input parameter: {desc}"
@@ -123,6 +131,27 @@ def get_placeholder_pattern(placeholder: str) -> str | None:
 # -------------------------
 
 
+@cache
+def _placeholder_schema(placeholder: str, usage_count: int | None) -> dict[str, str]:
+    """
+    Build the JSON schema for one placeholder.
+
+    Memoized per (placeholder, usage count): the same placeholder recurs across
+    many templates, so type, description and pattern are inferred once.
+    """
+    prop_schema = {
+        "type": get_placeholder_type(placeholder),
+        "description": get_placeholder_description(placeholder, usage_count),
+    }
+
+    # Add pattern validation if available
+    pattern = get_placeholder_pattern(placeholder)
+    if pattern:
+        prop_schema["pattern"] = pattern
+
+    return prop_schema
+
+
 def build_tool_from_template(
     template: PromptTemplate,
     placeholder_stats: dict[str, int] | None = None,
@@ -137,32 +166,28 @@ def build_tool_from_template(
     Returns:
         MCP Tool object with full schema
     """
-    # Build input schema from placeholders
-    properties = {}
-
-    for placeholder in template.placeholders:
-        usage_count = placeholder_stats.get(placeholder) if placeholder_stats else None
-
-        prop_schema = {
-            "type": get_placeholder_type(placeholder),
-            "description": get_placeholder_description(placeholder, usage_count),
-        }
-
-        # Add pattern validation if available
-        pattern = get_placeholder_pattern(placeholder)
-        if pattern:
-            prop_schema["pattern"] = pattern
-
-        properties[placeholder] = prop_schema
+    # Intern names so every schema shares one string per placeholder/tool name
+    placeholders = [sys.intern(placeholder) for placeholder in template.placeholders]
+
+    # Build input schema from placeholders; each tool gets its own copy of the
+    # memoized property schema so tools never share mutable dicts
+    properties = {
+        placeholder: dict(
+            _placeholder_schema(
+                placeholder, placeholder_stats.get(placeholder) if placeholder_stats else None
+            )
+        )
+        for placeholder in placeholders
+    }
 
     # Create the tool with full schema
     tool = Tool(
-        name=template.name,
+        name=sys.intern(template.name),
         description=template.get_description(),
         inputSchema={
             "type": "object",
             "properties": properties,
-            "required": template.placeholders,
+            "required": placeholders,
             "additionalProperties": False,
         },
     )
@@ -170,6 +195,42 @@ def build_tool_from_template(
     return tool
 
 
+# Shared layout for agent-facing tool descriptions
+_DESCRIPTION_HEADER = "\n\nParameters:\n"
+_PARAM_LINE = "- {name}{req}: {desc} (type: {type})"
+
+
+def build_tool_description(tool: Tool) -> str:
+    """
+    Build an agent-facing description listing the tool's parameters.
+
+    Args:
+        tool: MCP Tool object
+
+    Returns:
+        Tool description followed by one line per parameter
+    """
+    schema = tool.inputSchema
+    properties = schema.get("properties")
+    if not properties:
+        return tool.description
+
+    required = frozenset(schema.get("required", ()))
+    return (
+        tool.description
+        + _DESCRIPTION_HEADER
+        + "\n".join(
+            _PARAM_LINE.format(
+                name=name,
+                req=" (required)" if name in required else " (optional)",
+                desc=info.get("description", ""),
+                type=info.get("type", "string"),
+            )
+            for name, info in properties.items()
+        )
+    )
+
+
 def build_tools(
     *,
     filter_placeholder: str | None = None,
@@ -178,10 +239,13 @@ def build_tools(
     exact_match: bool = True,
     exclude_complex: bool = False,
     max_placeholders: int | None = None,
-) -> list[Tool]:
+    min_placeholders: int | None = None,
+) -> tuple[Tool, ...]:
     """
     Build MCP tools from TDC prompt definitions with flexible filtering.
 
+    Filters are applied to templates first, so no Tool is built for a skipped template.
+
     Args:
         filter_placeholder: Only build tools using this placeholder (e.g., "Drug SMILES")
         filter_placeholders: Only build tools using these placeholders
@@ -189,9 +253,10 @@ def build_tools(
         exact_match: If True, exact placeholder match. If False, fuzzy substring match.
         exclude_complex: If True, skip tools with many placeholders
         max_placeholders: Maximum number of placeholders per tool (None = no limit)
+        min_placeholders: Minimum number of placeholders per tool (None = no limit)
 
     Returns:
-        List of MCP Tool objects
+        Tuple of MCP Tool objects, sorted by name
 
     Examples:
         # All tools
@@ -209,6 +274,9 @@ def build_tools(
         # Simple tools only (≤2 placeholders)
         >>> build_tools(max_placeholders=2)
 
+        # Complex tools only (≥3 placeholders)
+        >>> build_tools(min_placeholders=3)
+
         # Any sequence-related tools (fuzzy match)
         >>> build_tools(filter_placeholder="sequence", exact_match=False)
     """
@@ -238,9 +306,17 @@ def build_tools(
             name: tmpl for name, tmpl in templates.items() if tmpl.placeholder_count() <= 2
         }
 
-    # Build tools
+    # Drop simple templates before any Tool is constructed for them
+    if min_placeholders is not None:
+        templates = {
+            name: tmpl
+            for name, tmpl in templates.items()
+            if tmpl.placeholder_count() >= min_placeholders
+        }
+
+    # Build tools in name order
     tools = []
-    for name, template in templates.items():
+    for name, template in sorted(templates.items()):
         try:
             tool = build_tool_from_template(template, placeholder_stats)
             tools.append(tool)
@@ -252,7 +328,7 @@ def build_tools(
             logger.error(f"Failed to build tool '{name}': {e}")
 
     logger.info(f"Successfully built {len(tools)} tools (filtered from {len(loader.all())} total)")
-    return tools
+    return tuple(tools)
 
 
 def get_tool_names(
@@ -286,53 +362,84 @@ def get_tool_names(
     return list(templates.keys())
 
 
-# -------------------------
-# Tool Introspection
-# -------------------------
+def tool_manifest_digest(tools: Iterable[Tool]) -> str:
+    """
+    Fingerprint a tool catalog.
 
+    Tools are serialized as canonical JSON (sorted by name, sorted keys, compact
+    separators), so the digest only changes when a name, description or schema
+    changes. Clients can key cached prompt prefixes on it.
 
-def analyze_tools() -> dict[str, Any]:
-    """
-    Analyze all available tools and return statistics.
+    Args:
+        tools: MCP Tool objects
 
     Returns:
-        Dictionary with tool analysis:
-        - total_tools: Total number of tools
-        - total_placeholders: Total unique placeholders
-        - placeholder_usage: Dict of placeholder -> usage count
-        - tools_by_complexity: Dict of placeholder_count -> tool_count
-        - most_common_placeholders: Top 10 placeholders
+        Hex digest of the canonical manifest
     """
+    manifest = [
+        {"name": t.name, "description": t.description, "inputSchema": t.inputSchema}
+        for t in sorted(tools, key=attrgetter("name"))
+    ]
+    blob = json.dumps(manifest, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# -------------------------
+# Tool Introspection
+# -------------------------
+
+
+@lru_cache(maxsize=1)
+def _analyze_tools() -> dict[str, Any]:
+    """Compute the tool statistics once; analyze_tools() hands out copies."""
     loader = get_loader()
 
     all_templates = loader.all()
     placeholder_stats = loader.placeholder_stats()
 
-    # Group by complexity
-    tools_by_complexity = {}
-    for template in all_templates.values():
-        count = template.placeholder_count()
-        tools_by_complexity[count] = tools_by_complexity.get(count, 0) + 1
+    # Group by complexity in one pass; simple/complex totals derive from the counts
+    tools_by_complexity = Counter(t.placeholder_count() for t in all_templates.values())
+    simple_tools = sum(n for count, n in tools_by_complexity.items() if count <= 2)
 
     return {
         "total_tools": len(all_templates),
         "total_placeholders": len(placeholder_stats),
         "placeholder_usage": placeholder_stats,
-        "tools_by_complexity": tools_by_complexity,
-        "most_common_placeholders": loader.most_common_placeholders(10),
-        "simple_tools": len([t for t in all_templates.values() if t.placeholder_count() <= 2]),
-        "complex_tools": len([t for t in all_templates.values() if t.placeholder_count() > 2]),
+        "tools_by_complexity": dict(tools_by_complexity),
+        "most_common_placeholders": tuple(loader.most_common_placeholders(10)),
+        "simple_tools": simple_tools,
+        "complex_tools": len(all_templates) - simple_tools,
     }
 
 
-def suggest_tool_subsets() -> dict[str, list[str]]:
+def analyze_tools() -> dict[str, Any]:
     """
-    Suggest useful subsets of tools based on common use cases.
+    Analyze all available tools and return statistics.
+
+    Computed once per process since prompts don't change at runtime; each call
+    returns a copy, so callers may modify the result freely.
+    Call ``analyze_tools.cache_clear()`` after reloading prompts.
 
     Returns:
-        Dictionary mapping use case -> list of tool names
+        Dictionary with tool analysis:
+        - total_tools: Total number of tools
+        - total_placeholders: Total unique placeholders
+        - placeholder_usage: Dict of placeholder -> usage count
+        - tools_by_complexity: Dict of placeholder_count -> tool_count
+        - most_common_placeholders: Top 10 (placeholder, count) pairs as a tuple
     """
+    stats = dict(_analyze_tools())
+    stats["placeholder_usage"] = dict(stats["placeholder_usage"])
+    stats["tools_by_complexity"] = dict(stats["tools_by_complexity"])
+    return stats
 
+
+analyze_tools.cache_clear = _analyze_tools.cache_clear
+
+
+@lru_cache(maxsize=1)
+def _suggest_tool_subsets() -> dict[str, list[str]]:
+    """Compute the tool subsets once; suggest_tool_subsets() hands out copies."""
     return {
         "drug_discovery": get_tool_names(filter_placeholder="Drug SMILES"),
         "protein_analysis": get_tool_names(filter_placeholder="sequence"),
@@ -341,3 +448,19 @@ def suggest_tool_subsets() -> dict[str, list[str]]:
             filter_placeholders=["Drug SMILES", "Target sequence"], match_all=True
         ),
     }
+
+
+def suggest_tool_subsets() -> dict[str, list[str]]:
+    """
+    Suggest useful subsets of tools based on common use cases.
+
+    Computed once per process; each call returns fresh lists. Call
+    ``suggest_tool_subsets.cache_clear()`` after reloading prompts.
+
+    Returns:
+        Dictionary mapping use case -> list of tool names
+    """
+    return {use_case: list(names) for use_case, names in _suggest_tool_subsets().items()}
+
+
+suggest_tool_subsets.cache_clear = _suggest_tool_subsets.cache_clear